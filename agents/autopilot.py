@@ -0,0 +1,306 @@
+import random
+import weakref
+from itertools import islice
+
+from components.brain import Brain
+from components.snake import Snake
+from enums.direction import Direction
+from utils.bitboard import FreeCellBitboard
+
+# Distance of the positions, from which the food can not be reached
+UNREACHABLE = 1 << 30
+
+
+class Autopilot:
+    """
+    Autopilot, that plays the game by following the shortest path to the food.
+
+    The shortest paths are found with a distance field: the distance from every game area position to the food,
+    found with a breadth-first search from the food through the positions, that are not occupied by the snake.
+    The field is computed once per food and patched as the snake moves, instead of being computed every step:
+        * the autopilot observes the snake's body (see Snake.attach_body_observer),
+        * a position, that the snake's head enters, is blocked (its distance is no longer known),
+        * a position, that the tail leaves, is freed and gets its distance from its neighbours.
+    The distances of the other positions can only get outdated, if the snake blocks their shortest path,
+    in which case the snake stops getting closer to the food (or the path breaks) and the field is computed again.
+
+    The snake does not trap itself, as its tail has to stay reachable from its head (checked with a flood fill
+    of the free positions bitboard):
+        * before the snake heads for a new food, the whole path is checked: a virtual snake follows the path,
+          and its tail has to be reachable from the food, after the virtual snake has eaten it,
+        * before each move, the tail has to stay reachable from the new head position.
+    If the path is not safe, the snake stalls (follows random safe moves) and checks the path again on the next step.
+    """
+
+    def __init__(self, brain: Brain, seed: int = 0):
+        """
+        Autopilot constructor method.
+
+        :param brain: Game brain, whose game the autopilot plays (used for the game area measurements).
+        :param seed: Seed of the random number generator, that selects the stalling moves.
+        """
+        self.left, self.top = brain.left_border, brain.top_border
+        self.width, self.height = brain.game_area_width, brain.game_area_height
+
+        # Game area positions are indexed row by row: index = (y - top) * width + (x - left)
+        width, height = self.width, self.height
+        self.neighbours = [[index + offset for offset, inside in ((-1, index % width > 0),
+                                                                  (1, index % width < width - 1),
+                                                                  (-width, index >= width),
+                                                                  (width, index < width * (height - 1))) if inside]
+                           for index in range(width * height)]
+
+        self.snake = None  # Observed snake
+        self.blocked = bytearray(width * height)  # 1 - position is occupied by the snake, 0 - position is free
+        self.own_bitboard = None  # Free positions bitboard, if the brain does not track them with a bitboard
+
+        self.distances = [UNREACHABLE] * (width * height)  # Distance field of the food
+        self.food = None  # Food, that the distance field was computed for
+        self.head_distance = UNREACHABLE  # Distance of the snake's head, when it entered its position
+        self.path_safe = False  # Whether the path to the food has passed the virtual snake check
+        self.rng = random.Random(seed)
+
+    def __call__(self, brain: Brain) -> Direction:
+        """
+        Select the snake's next direction.
+
+        :param brain: Game brain of the played game.
+        :return: Direction of the next step.
+        """
+        snake = brain.snake
+        if self not in snake.body_observers:  # A new game has started
+            self.attach(brain)
+
+        moves = self.possible_moves(snake)
+        if brain.food is not None:
+            if brain.food is not self.food:
+                self.compute_distance_field(brain)
+
+            distance, direction, position = min(moves, key=move_distance, default=(UNREACHABLE, None, None))
+            # The field is outdated, if the snake is not getting closer to the food or the path to the food is broken
+            path = None
+            outdated = UNREACHABLE > self.head_distance <= distance
+            if not outdated and distance < UNREACHABLE and not self.path_safe:
+                path = self.find_path(position)
+                outdated = path is None
+            if outdated:
+                self.compute_distance_field(brain)
+                moves = self.possible_moves(snake)
+                distance, direction, position = min(moves, key=move_distance, default=(UNREACHABLE, None, None))
+                path = self.find_path(position) if distance < UNREACHABLE else None
+            if path is not None:
+                self.path_safe = self.is_path_safe(brain, path)
+            if distance < UNREACHABLE and self.path_safe and self.is_safe(brain, position):
+                self.head_distance = distance
+                return direction
+
+        # Stall: follow a random safe move (always preferring the same moves can make the snake circle forever)
+        self.head_distance = UNREACHABLE
+        self.path_safe = False
+        safe_directions = [direction for distance, direction, position in moves if self.is_safe(brain, position)]
+        if safe_directions:
+            return self.rng.choice(safe_directions)
+        return moves[0][1] if moves else snake.direction
+
+    def attach(self, brain: Brain) -> None:
+        """Start observing the brain's current snake."""
+        self.snake = brain.snake
+        if not isinstance(brain.free_cells, FreeCellBitboard):
+            self.own_bitboard = FreeCellBitboard(self.left, self.top, self.width, self.height)
+        self.snake.attach_body_observer(self)
+
+    def possible_moves(self, snake: Snake) -> list[tuple[int, Direction, tuple[int, int]]]:
+        """
+        Find the moves, that do not collide with a border or the snake's body in the next step.
+
+        :return: List of the moves (distance to the food, direction, new head position).
+        """
+        head_x, head_y = snake.get_head_position()
+        tail_position = snake.get_tail_position()
+        moves = []
+        for direction, (move_x, move_y) in Snake.DIRECTION_MOVES.items():
+            if snake.length() > 1 and direction == Snake.opposite_direction(snake.direction):
+                continue
+            position = head_x + move_x * snake.step, head_y + move_y * snake.step
+            index = self.position_index(position)
+            if index is None:
+                continue
+            # The tail moves away during the step, unless the snake has just grown (the tail position is duplicated)
+            if self.blocked[index] and (position != tail_position or snake.occupancy[position] > 1):
+                continue
+            moves.append((self.distances[index], direction, position))
+        return moves
+
+    def is_safe(self, brain: Brain, position: tuple[int, int]) -> bool:
+        """
+        Check if the snake's tail stays reachable from the head after moving the head to the position.
+
+        The flood fill is skipped, if the position has no obstacles around it (apart from the current head),
+        as then occupying it can not split the free positions.
+
+        :param brain: Game brain of the played game.
+        :param position: New head position.
+        """
+        snake = self.snake
+        if snake.length() <= 2 or self.is_surrounded_by_free_positions(position, snake.get_head_position()):
+            return True
+
+        bitboard = self.own_bitboard if self.own_bitboard is not None else brain.free_cells
+        tail_position = snake.get_tail_position()
+        passable = bitboard.to_int() & ~(1 << bitboard.position_bit(position))
+        if snake.occupancy[tail_position] == 1:  # The tail moves away
+            passable |= 1 << bitboard.position_bit(tail_position)
+        return bitboard.is_reachable(position, snake.get_body_position(-2), passable)
+
+    def find_path(self, position: tuple[int, int]):
+        """
+        Follow the distance field from the position to the food.
+
+        :param position: First position of the path (next head position).
+        :return: Positions of the path (ending with the food) or None if the path is broken (the field is outdated).
+        """
+        distances, neighbours, width = self.distances, self.neighbours, self.width
+        index = self.position_index(position)
+        path = [index]
+        while distances[index]:
+            index = next((neighbour for neighbour in neighbours[index]
+                          if distances[neighbour] == distances[index] - 1), None)
+            if index is None:
+                return None
+            path.append(index)
+        return [(self.left + index % width, self.top + index // width) for index in path]
+
+    def is_path_safe(self, brain: Brain, path: list[tuple[int, int]]) -> bool:
+        """
+        Check if the snake can reach its tail after it follows the path to the food and eats it.
+
+        The free positions after the snake has eaten the food are derived from the current ones:
+        the positions, that the tail leaves on the way, are freed and the path is occupied. The snake grows,
+        so its tail stays in place during the next step: the tail has to be reachable through a free position
+        next to the food, not straight from the food.
+
+        :param brain: Game brain of the played game.
+        :param path: Positions of the path from the next head position to the food (see find_path).
+        """
+        snake = self.snake
+        # After the moves the snake's body consists of the end of the path and the start of the current body
+        length, moves = snake.length(), len(path)
+        tail_position = snake.get_body_position(length - moves - 1) if moves < length else path[moves - length]
+        bitboard = self.own_bitboard if self.own_bitboard is not None else brain.free_cells
+        bits = bytearray(bitboard.bits)
+        for body_position in islice(reversed(snake.body_positions), moves):  # Positions left by the tail
+            if body_position != tail_position:
+                bit = bitboard.position_bit(body_position)
+                bits[bit >> 3] |= 1 << (bit & 7)
+        for path_position in path[max(0, moves - length):]:
+            bit = bitboard.position_bit(path_position)
+            bits[bit >> 3] &= ~(1 << (bit & 7))
+
+        reachable = bitboard.flood_fill(path[-1], int.from_bytes(bits, "little"))
+        return bool(bitboard.spread(reachable) >> bitboard.position_bit(tail_position) & 1)
+
+    def is_surrounded_by_free_positions(self, position: tuple[int, int], head_position: tuple[int, int]) -> bool:
+        """Check if all 8 positions around the position (apart from the head) are free game area positions."""
+        x, y = position
+        for neighbour in ((x - 1, y - 1), (x, y - 1), (x + 1, y - 1), (x - 1, y),
+                          (x + 1, y), (x - 1, y + 1), (x, y + 1), (x + 1, y + 1)):
+            if neighbour == head_position:
+                continue
+            index = self.position_index(neighbour)
+            if index is None or self.blocked[index]:
+                return False
+        return True
+
+    def position_index(self, position: tuple[int, int]):
+        """Get the index of the game area position (None if the position is outside the game area)."""
+        x, y = position[0] - self.left, position[1] - self.top
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return y * self.width + x
+        return None
+
+    # --------------------------------------- DISTANCE FIELD ---------------------------------------
+
+    def compute_distance_field(self, brain: Brain) -> None:
+        """Compute the distance of every free position to the brain's current food with a breadth-first search."""
+        distances = [UNREACHABLE] * (self.width * self.height)
+        visited = bytearray(self.blocked)  # The blocked positions are never visited
+        neighbours = self.neighbours
+        food_index = self.position_index(brain.food.get_position())
+        distances[food_index], visited[food_index] = 0, 1
+        frontier, distance = [food_index], 0
+        while frontier:  # Visit the positions layer by layer (all the positions of a layer have the same distance)
+            distance += 1
+            next_frontier = []
+            for index in frontier:
+                for neighbour in neighbours[index]:
+                    if not visited[neighbour]:
+                        visited[neighbour] = 1
+                        distances[neighbour] = distance
+                        next_frontier.append(neighbour)
+            frontier = next_frontier
+        self.distances = distances
+        self.food = brain.food
+        self.head_distance = UNREACHABLE
+        self.path_safe = False
+
+    def free_position(self, index: int) -> None:
+        """
+        Set the distance of the freed position from the distances of its neighbours.
+
+        The distances are not lowered any further: behind a long body the new shortcut would lower the distances
+        of the whole area on every step. The field stays valid (the distances are the lengths of existing paths),
+        and it is computed again, once the snake stops getting closer to the food.
+        """
+        distances = self.distances
+        distance = min(distances[neighbour] for neighbour in self.neighbours[index]) + 1
+        distances[index] = min(distance, UNREACHABLE)
+
+    # ------------------------------------ BODY OBSERVER METHODS -----------------------------------
+
+    def clear(self) -> None:
+        """Mark all the positions as free (before the snake's body positions are added)."""
+        self.blocked = bytearray(self.width * self.height)
+        if self.own_bitboard is not None:
+            self.own_bitboard = FreeCellBitboard(self.left, self.top, self.width, self.height)
+        self.food = None  # The distance field has to be computed again
+
+    def add(self, position: tuple[int, int], serial: int) -> None:
+        """Block the position occupied by the snake."""
+        index = self.position_index(position)
+        if index is None or self.blocked[index]:
+            return
+        self.blocked[index] = 1
+        self.distances[index] = UNREACHABLE
+        if self.own_bitboard is not None:
+            self.own_bitboard.discard(position)
+
+    def remove(self, position: tuple[int, int], serial: int) -> None:
+        """Free the position, if the snake no longer occupies it."""
+        index = self.position_index(position)
+        if index is None or self.snake.is_occupied(position):
+            return
+        self.blocked[index] = 0
+        if self.own_bitboard is not None:
+            self.own_bitboard.add(position)
+        if self.food is not None:
+            self.free_position(index)
+
+
+def move_distance(move: tuple[int, Direction, tuple[int, int]]) -> int:
+    """Distance to the food after the move (see Autopilot.possible_moves)."""
+    return move[0]
+
+
+_autopilots = weakref.WeakKeyDictionary()  # Autopilot of each game brain
+
+
+def autopilot_policy(brain: Brain) -> Direction:
+    """
+    Play the game with the autopilot (see Autopilot), that follows the shortest path to the food.
+
+    Every game brain gets its own autopilot, which keeps its distance field between the steps.
+    """
+    autopilot = _autopilots.get(brain)
+    if autopilot is None:
+        autopilot = _autopilots[brain] = Autopilot(brain)
+    return autopilot(brain)
@@ -0,0 +1,44 @@
+import random
+
+from components.brain import Brain
+from components.snake import Snake
+from enums.direction import Direction
+
+
+def straight_policy(brain: Brain) -> Direction:
+    """Keep moving in the snake's current direction."""
+    return brain.snake.direction
+
+
+def random_policy(brain: Brain) -> Direction:
+    """Turn to a random direction (turning back is ignored by the snake)."""
+    return random.choice(list(Direction))
+
+
+def greedy_policy(brain: Brain) -> Direction:
+    """
+    Move towards the food, while avoiding the moves that would end the game straight away.
+
+    Directions, which do not collide with a border or the snake's body in the next step, are preferred,
+    among those the direction which gets the snake's head closest to the food (Manhattan distance) is selected.
+    If every direction leads to a collision, the snake keeps its current direction.
+    """
+    snake = brain.snake
+    head_x, head_y = snake.get_head_position()
+    tail_position = snake.get_tail_position()
+    target = brain.food.get_position() if brain.food is not None else tail_position
+
+    best_direction, best_distance = snake.direction, None
+    for direction, (move_x, move_y) in Snake.DIRECTION_MOVES.items():
+        if snake.length() > 1 and direction == Snake.opposite_direction(snake.direction):
+            continue
+        position = head_x + move_x * snake.step, head_y + move_y * snake.step
+        if not brain.in_game_area(position):
+            continue
+        # The tail moves away during the step, unless the snake has just grown (the tail position is duplicated)
+        if snake.is_occupied(position) and (position != tail_position or snake.occupancy[position] > 1):
+            continue
+        distance = abs(position[0] - target[0]) + abs(position[1] - target[1])
+        if best_distance is None or distance < best_distance:
+            best_direction, best_distance = direction, distance
+    return best_direction
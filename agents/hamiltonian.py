@@ -0,0 +1,138 @@
+from functools import lru_cache
+from typing import NamedTuple
+
+from components.brain import Brain
+from components.snake import Snake
+from enums.direction import Direction
+
+# Amount of free positions, that are always kept between the head and the tail (along the cycle),
+# when taking a shortcut
+SHORTCUT_MARGIN = 3
+
+# Direction of each move (the opposite of Snake.DIRECTION_MOVES)
+MOVE_DIRECTIONS = {move: direction for direction, move in Snake.DIRECTION_MOVES.items()}
+
+
+class HamiltonianCycle(NamedTuple):
+    """Cycle through all the positions of a game area, that visits every position exactly once."""
+    positions: tuple  # Positions (x, y) in the order of the cycle
+    order: dict  # Position (x, y) -> index of the position in the cycle
+
+
+def build_cycle(width: int, height: int) -> list[tuple[int, int]]:
+    """
+    Build a Hamiltonian cycle of a width x height grid in linear time.
+
+    The cycle goes right along the top row, then back and forth along the rest of the rows (leaving out
+    the leftmost column), and returns up the leftmost column. This requires an even amount of rows,
+    so if the amount of rows is odd, the cycle is built on the transposed grid (columns instead of rows).
+
+    :param width: Width of the grid.
+    :param height: Height of the grid.
+    :return: Positions (x, y) of the grid (relative to its top left corner) in the order of the cycle.
+    """
+    if height % 2:
+        if width % 2:
+            raise ValueError("A Hamiltonian cycle does not exist on a game area with an odd amount of both "
+                             "columns and rows.")
+        return [(x, y) for y, x in build_cycle(height, width)]
+
+    cycle = [(x, 0) for x in range(width)]
+    for y in range(1, height):
+        columns = range(width - 1, 0, -1) if y % 2 else range(1, width)
+        cycle.extend((x, y) for x in columns)
+    cycle.extend((0, y) for y in range(height - 1, 0, -1))
+    return cycle
+
+
+@lru_cache(maxsize=None)
+def hamiltonian_cycle(width: int, height: int, borders: tuple[int, int, int, int]) -> HamiltonianCycle:
+    """
+    Get the Hamiltonian cycle of a game area (the cycle is built once per game area and cached).
+
+    :param width: Width of the game area measured in in-game blocks.
+    :param height: Height of the game area measured in in-game blocks.
+    :param borders: Border widths (top, bottom, left, right) measured in in-game blocks.
+    :return: Cycle through all the game area positions.
+    """
+    top, _, left, _ = borders
+    positions = tuple((left + x, top + y) for x, y in build_cycle(width, height))
+    return HamiltonianCycle(positions, {position: index for index, position in enumerate(positions)})
+
+
+def brain_cycle(brain: Brain) -> HamiltonianCycle:
+    """Get the Hamiltonian cycle of the brain's game area."""
+    return hamiltonian_cycle(brain.game_area_width, brain.game_area_height,
+                             (brain.top_border, brain.bottom_border, brain.left_border, brain.right_border))
+
+
+def hamiltonian_policy(brain: Brain) -> Direction:
+    """
+    Follow a Hamiltonian cycle of the game area, taking safe shortcuts towards the food.
+
+    A snake, that follows a cycle through every position, never collides and eventually fills the whole game area,
+    but it takes up to a lap of the cycle for every food. To get to the food faster,
+    the snake skips ahead along the cycle, while keeping its body in the order of the cycle
+    (from the tail to the head):
+        * the snake moves to the neighbouring position, that gets it the furthest along the cycle,
+        * without passing the food (it would take a whole lap to get back to it),
+        * and without getting closer to the tail than SHORTCUT_MARGIN and an allowance for the growth
+          (half of the snake's length), so the skipped positions are left by the tail,
+          before the head gets there again.
+    Once the free run to the tail gets too short, the snake follows the cycle,
+    so the game takes a bounded amount of steps (at most a lap per food).
+
+    Once the snake fills the game area, it collides on purpose, which ends the game with the winning status
+    (a full snake could otherwise keep following its tail forever).
+
+    The game area has to have an even amount of columns or rows (otherwise a Hamiltonian cycle does not exist).
+    """
+    if brain.snake_at_max_capacity():
+        return collision_direction(brain)
+
+    cycle = brain_cycle(brain)
+    size, order = len(cycle.positions), cycle.order
+    snake = brain.snake
+    head_x, head_y = snake.get_head_position()
+    head_index = order[head_x, head_y]
+
+    # Cycle distance to the tail (the whole cycle, if the snake is a single block long)
+    tail_distance = (order[snake.get_tail_position()] - head_index) % size or size
+    next_position = cycle.positions[(head_index + 1) % size]
+    best_position, best_distance = next_position, 1
+
+    if brain.food is not None:
+        food_distance = (order[brain.food.get_position()] - head_index) % size
+        # The skipped positions are free again, once the tail has passed them, but the snake keeps growing
+        # in the meantime, so some of the run to the tail is kept back as an allowance for the growth
+        growth_allowance = snake.length() // 2
+        max_distance = min(food_distance, tail_distance - SHORTCUT_MARGIN - growth_allowance)
+        if max_distance > 1:
+            for direction, (move_x, move_y) in Snake.DIRECTION_MOVES.items():
+                if snake.length() > 1 and direction == Snake.opposite_direction(snake.direction):
+                    continue  # Turning back is ignored (e.g. the snake has grown while being a single block long)
+                position = head_x + move_x * snake.step, head_y + move_y * snake.step
+                index = order.get(position)
+                if index is None or snake.is_occupied(position):
+                    continue
+                distance = (index - head_index) % size
+                if best_distance < distance <= max_distance:
+                    best_position, best_distance = position, distance
+
+    return MOVE_DIRECTIONS[(best_position[0] - head_x) // snake.step, (best_position[1] - head_y) // snake.step]
+
+
+def collision_direction(brain: Brain) -> Direction:
+    """Get a direction, in which the snake collides with a border or its body in the next step."""
+    snake = brain.snake
+    head_x, head_y = snake.get_head_position()
+    tail_position = snake.get_tail_position()
+    for direction, (move_x, move_y) in Snake.DIRECTION_MOVES.items():
+        if snake.length() > 1 and direction == Snake.opposite_direction(snake.direction):
+            continue
+        position = head_x + move_x * snake.step, head_y + move_y * snake.step
+        # The tail moves away during the step, unless the snake has just grown (the tail position is duplicated)
+        if not brain.in_game_area(position) or (snake.is_occupied(position) and
+                                                (position != tail_position or snake.occupancy[position] > 1)):
+            return direction
+    return snake.direction
@@ -0,0 +1,250 @@
+"""
+Benchmark suite for the simulation and rendering hot paths of the game.
+
+Every benchmark is run on a matrix of board sizes and snake lengths. The snake is set up along a cycle,
+that covers the game area, and keeps moving along it, so the benchmarks never end the game and are reproducible
+(every game is seeded). The UI is drawn with the SDL dummy video driver, so no window is needed.
+
+The results are printed as a table and can be written to a JSON file, which can later serve as the baseline:
+if the results are compared against a baseline, the benchmarks that got slower than the allowed threshold
+are reported and the run fails.
+
+Usage (from the repository root):
+
+    python -m benchmarks.benchmark --output results.json
+    python -m benchmarks.benchmark --baseline benchmarks/baseline.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # Draw offscreen, before pygame is imported
+
+import pygame
+
+from agents.hamiltonian import MOVE_DIRECTIONS, build_cycle
+from components.brain import Brain
+from components.snake import SnakeSnapshot
+from components.ui import Ui
+from enums.direction import Direction
+from tools.tournament import parse_board
+
+DEFAULT_BOARDS = [(20, 20), (80, 60), (320, 240)]
+DEFAULT_LENGTHS = [1, 100, 1000, 10_000]
+
+# A benchmark prepares the measured operation for the brain, whose snake is set up along the cycle
+Benchmark = Callable[[Brain, "CycleWalker"], Callable[[], object]]
+
+
+class CycleWalker:
+    """
+    Cycle through all the positions of the game area (Hamiltonian cycle), that the snake can follow forever.
+
+    The cycle is the one followed by the Hamiltonian policy (agents.hamiltonian). If the game area has an odd
+    amount of both columns and rows (no Hamiltonian cycle exists), the bottom row is left out of the cycle.
+    """
+
+    def __init__(self, brain: Brain):
+        """
+        Cycle Walker constructor method.
+
+        :param brain: Game brain, whose game area the cycle covers.
+        """
+        left, top = brain.left_border, brain.top_border
+        width, height = brain.game_area_width, brain.game_area_height
+        if width % 2 and height % 2:
+            height -= 1
+        self.cycle = [(left + x, top + y) for x, y in build_cycle(width, height)]
+
+        self.directions = [MOVE_DIRECTIONS[(next_x - x, next_y - y)] for (x, y), (next_x, next_y) in
+                           zip(self.cycle, self.cycle[1:] + self.cycle[:1])]
+        self.index = 0  # Index of the snake's head position in the cycle
+
+    def set_up_snake(self, brain: Brain, length: int) -> None:
+        """Place the brain's snake of the given length along the cycle, with the head heading along the cycle."""
+        self.index = length - 1
+        body_positions = tuple(self.cycle[index] for index in range(self.index, -1, -1))
+        brain.snake.restore(SnakeSnapshot(body_positions, self.directions[self.index]))
+        brain.generate_food()
+
+    def next_direction(self) -> Direction:
+        """Get the direction of the next step along the cycle and advance to the next position."""
+        direction = self.directions[self.index]
+        self.index = (self.index + 1) % len(self.cycle)
+        return direction
+
+
+def benchmark_snake_move(brain: Brain, walker: CycleWalker):
+    snake = brain.snake
+
+    def operation():
+        snake.direction = walker.next_direction()
+        snake.move()
+    return operation
+
+
+def benchmark_self_collision_detection(brain: Brain, walker: CycleWalker):
+    return brain.snake.self_collision_detection
+
+
+def benchmark_get_free_positions(brain: Brain, walker: CycleWalker):
+    return brain.get_free_positions
+
+
+def benchmark_generate_food(brain: Brain, walker: CycleWalker):
+    return brain.generate_food
+
+
+def benchmark_brain_snake_move(brain: Brain, walker: CycleWalker):
+    snake = brain.snake
+
+    def operation():
+        snake.direction = walker.next_direction()
+        brain.snake_move()
+    return operation
+
+
+def benchmark_ui_draw_game(brain: Brain, walker: CycleWalker):
+    block_size = max(1, min(10, 800 // brain.display_width))
+    return Ui(brain, block_size).draw_game
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "snake.move": benchmark_snake_move,
+    "snake.self_collision_detection": benchmark_self_collision_detection,
+    "brain.get_free_positions": benchmark_get_free_positions,
+    "brain.generate_food": benchmark_generate_food,
+    "brain.snake_move": benchmark_brain_snake_move,
+    "ui.draw_game": benchmark_ui_draw_game,
+}
+
+
+def measure(operation: Callable[[], object], repeat: int, min_time: float) -> float:
+    """
+    Measure the time an operation takes.
+
+    The operation is called in batches, the batch size is doubled until a batch takes at least min_time.
+    Then the batch is timed repeat times and the fastest time is used (the slower ones are slowed down by noise).
+
+    :param operation: Operation to measure.
+    :param repeat: Amount of timed batches.
+    :param min_time: Minimum duration of a batch measured in seconds.
+    :return: Time per operation measured in nanoseconds.
+    """
+    timer = time.perf_counter
+    batch_size = 1
+    while True:
+        start_time = timer()
+        for _ in range(batch_size):
+            operation()
+        if timer() - start_time >= min_time:
+            break
+        batch_size *= 2
+
+    best_time = float("inf")
+    for _ in range(repeat):
+        start_time = timer()
+        for _ in range(batch_size):
+            operation()
+        best_time = min(best_time, timer() - start_time)
+    return best_time / batch_size * 1e9
+
+
+def run_benchmarks(names: list[str], boards: list[tuple[int, int]], lengths: list[int],
+                   repeat: int = 5, min_time: float = 0.05) -> list[dict]:
+    """
+    Run the benchmarks on every combination of board size and snake length.
+
+    Snake lengths, that do not fit on the board, are left out.
+
+    :param names: Names of the benchmarks to run (see BENCHMARKS).
+    :param boards: Game area sizes (width, height) measured in in-game blocks.
+    :param lengths: Lengths of the snake.
+    :param repeat: Amount of timed batches per benchmark.
+    :param min_time: Minimum duration of a timed batch measured in seconds.
+    :return: Results of the benchmarks.
+    """
+    pygame.init()
+    results = []
+    for board in boards:
+        for length in lengths:
+            for name in names:
+                brain = Brain(board[0], board[1], [], seed=0)
+                walker = CycleWalker(brain)
+                if length >= len(walker.cycle):
+                    continue
+                walker.set_up_snake(brain, length)
+                brain.unpause_game()
+                ns_per_op = measure(BENCHMARKS[name](brain, walker), repeat, min_time)
+                results.append({"benchmark": name, "board": f"{board[0]}x{board[1]}", "length": length,
+                                "ns_per_op": ns_per_op})
+                print(f"{name:<32} {board[0]:>5}x{board[1]:<5} {length:>7} {ns_per_op:>14.1f} ns/op", flush=True)
+    pygame.quit()
+    return results
+
+
+def compare_results(results: list[dict], baseline: list[dict], threshold: float) -> list[str]:
+    """
+    Compare the results against the baseline results.
+
+    :param results: Results of the current run.
+    :param baseline: Results of the baseline run.
+    :param threshold: Allowed relative slowdown (e.g. 0.25 allows the benchmarks to be 25% slower).
+    :return: Descriptions of the benchmarks, that got slower than allowed.
+    """
+    baseline_times = {(result["benchmark"], result["board"], result["length"]): result["ns_per_op"]
+                      for result in baseline}
+    regressions = []
+    for result in results:
+        baseline_time = baseline_times.get((result["benchmark"], result["board"], result["length"]))
+        if baseline_time is None:
+            continue
+        ratio = result["ns_per_op"] / baseline_time
+        if ratio > 1 + threshold:
+            regressions.append(f"{result['benchmark']} {result['board']} length {result['length']}: "
+                               f"{baseline_time:.1f} -> {result['ns_per_op']:.1f} ns/op ({ratio:.2f}x)")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the simulation and rendering hot paths of the game.")
+    parser.add_argument("--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help="Benchmarks to run (default: all).")
+    parser.add_argument("--boards", nargs="+", type=parse_board, default=DEFAULT_BOARDS,
+                        help="Game area sizes in the format 'WIDTHxHEIGHT'.")
+    parser.add_argument("--lengths", nargs="+", type=int, default=DEFAULT_LENGTHS, help="Lengths of the snake.")
+    parser.add_argument("--repeat", type=int, default=5, help="Amount of timed batches per benchmark.")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Minimum duration of a timed batch (seconds).")
+    parser.add_argument("--output", help="Write the results to the given JSON file.")
+    parser.add_argument("--baseline", help="Compare the results against the results in the given JSON file.")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed relative slowdown compared to the baseline (default: 0.25).")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.benchmarks, args.boards, args.lengths, args.repeat, args.min_time)
+
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump({
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "platform": platform.platform(),
+                "results": results,
+            }, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_results(results, json.load(baseline_file)["results"], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmarks are more than {args.threshold:.0%} slower than the baseline:")
+            print("\n".join(regressions))
+            sys.exit(1)
+        print("No regressions compared to the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import numpy as np
+import pygame
+
+from components.brain import Brain
+from components.ui import Ui
+from enums.score_type import ScoreType
+from utils import colors
+
+
+class ArrayUi(Ui):
+    """
+    Game UI class, that draws the game board as an array instead of block by block.
+
+    The board is stored as a NumPy grid of color indices with one element per in-game block.
+    Every frame the snake and the food colors are written into the grid with vectorized indexing,
+    the grid is converted to pixels with pygame.surfarray and scaled up to the block size with a single
+    pygame.transform.scale call. This makes the cost of a frame depend on the size of the board,
+    instead of the snake's length times the cost of a pygame.draw.rect call, so it suits long snakes.
+
+    Requires NumPy (pip install numpy).
+    """
+
+    def __init__(self, brain: Brain, block_size: int = 10, viewport: tuple[int, int] = None,
+                 base_color=colors.BLACK, border_color=colors.WHITE):
+        """
+        Array Game UI constructor method.
+
+        :param brain: Game brain, which provides the game state, for which the UI is displayed.
+        :param block_size: The amount of pixels that should be displayed per one in-game block.
+        :param viewport: Width and height of the displayed part of the game board measured in in-game blocks.
+                         If set to None (default), the whole game board is displayed.
+        :param base_color: Color of the game board background.
+        :param border_color: Color of the borders.
+        """
+        super().__init__(brain, block_size, viewport)
+
+        self.palette_colors = [base_color, border_color]  # Colors of the grid's color indices
+        self.palette_indices = {base_color: 0, border_color: 1}
+        self.palette = np.array(self.palette_colors, dtype=np.uint8)
+
+        self.base_grid = np.zeros((brain.display_width, brain.display_height), dtype=np.uint8)  # Indexed as [x, y]
+        for x, y, width, height in brain.get_borders():
+            self.base_grid[x:x + width, y:y + height] = 1  # Game area with borders
+
+        grid_size = (self.view_width, self.view_height)
+        self.grid = np.zeros(grid_size, dtype=np.uint8)  # Color indices of the current frame's viewport
+        self.pixels = np.zeros(grid_size + (3,), dtype=np.uint8)  # Colors of the current frame (one pixel per block)
+        self.grid_surface = pygame.Surface(grid_size).convert(self.display)
+
+        self.snake_color_indices = None  # Cached color indices of the snake's colors (see get_snake_color_indices)
+        self.snake_color_key = None
+
+    def draw_game(self) -> None:
+        """
+        Display the game screen.
+
+        The game area, the snake and the food are drawn as a single scaled array (see draw_board),
+        the texts are displayed on top of it.
+        """
+        self.update_camera()
+        self.draw_board()
+        self.display_score(ScoreType.CURRENT, self.blocks_to_pixels(self.brain.left_border))
+        self.display_score(ScoreType.HIGH, round(self.display_width * 0.8), 0, "Highscore: ")
+        self.display_scheme_name()
+        if self.brain.game_paused:
+            self.draw_pause_elements()
+
+    def draw_board(self) -> None:
+        """
+        Draw the game area with the borders, the food and the snake inside the viewport
+        by scaling the color index grid.
+        """
+        grid = self.grid
+        camera_left, camera_top = self.camera_left, self.camera_top
+        np.copyto(grid, self.base_grid[camera_left:camera_left + self.view_width,
+                                       camera_top:camera_top + self.view_height])
+
+        brain = self.brain
+        if brain.food is not None:
+            food_x, food_y = brain.food.get_position()
+            food_x, food_y = food_x - camera_left, food_y - camera_top
+            if 0 <= food_x < grid.shape[0] and 0 <= food_y < grid.shape[1]:
+                grid[food_x, food_y] = self.get_color_index(self.get_food_color())
+
+        # Positions are written from the head to the tail, so the later positions are drawn over the earlier ones
+        color_indices = self.get_snake_color_indices()
+        if self.is_view_culled():
+            segments = self.get_visible_segments()
+            color_indices = color_indices[np.fromiter((index for index, _ in segments), dtype=np.intp,
+                                                      count=len(segments))]
+            body = np.array([position for _, position in segments], dtype=np.intp).reshape(-1, 2)
+        else:
+            body = np.array(brain.snake.body_positions, dtype=np.intp).reshape(-1, 2)
+        x, y = body[:, 0] - camera_left, body[:, 1] - camera_top
+        visible = (x >= 0) & (x < grid.shape[0]) & (y >= 0) & (y < grid.shape[1])
+        if not visible.all():
+            x, y, color_indices = x[visible], y[visible], color_indices[visible]
+        grid[x, y] = color_indices
+
+        np.take(self.palette, grid, axis=0, out=self.pixels)
+        pygame.surfarray.blit_array(self.grid_surface, self.pixels)
+        pygame.transform.scale(self.grid_surface, self.display.get_size(), self.display)
+
+    def get_snake_color_indices(self) -> np.ndarray:
+        """
+        Get the color indices of the snake's positions, from the head to the tail.
+
+        The indices are cached and only looked up again, when the snake's colors change (see get_snake_colors).
+
+        :return: Array of color indices, one for each of the snake's positions.
+        """
+        snake_colors = self.color_scheme.get_snake_colors(self.brain.snake.length())
+        # The cached list is kept in the key, so it is compared by identity and its id can not be reused
+        snake_color_key = (snake_colors, len(snake_colors))
+        if (self.snake_color_key is None or self.snake_color_key[0] is not snake_colors or
+                self.snake_color_key[1] != len(snake_colors)):
+            self.snake_color_indices = np.array([self.get_color_index(color) for color in snake_colors],
+                                                dtype=np.uint8)
+            self.snake_color_key = snake_color_key
+        return self.snake_color_indices
+
+    def get_color_index(self, color: tuple[int, int, int]) -> int:
+        """
+        Get the index of the color in the palette, adding the color to the palette if needed.
+
+        :param color: Color (r, g, b).
+        :return: Index of the color in the palette.
+        """
+        color = tuple(color)
+        if color not in self.palette_indices:
+            self.palette_indices[color] = len(self.palette_colors)
+            self.palette_colors.append(color)
+            self.palette = np.array(self.palette_colors, dtype=np.uint8)
+        return self.palette_indices[color]
@@ -0,0 +1,310 @@
+import numpy as np
+
+from enums.direction import Direction
+from enums.game_status import GameStatus
+
+# Directions in the order of their action indices, along with the unit shifts of the coordinates (x, y)
+DIRECTIONS = list(Direction)
+DIRECTION_X = np.array([{Direction.RIGHT: 1, Direction.LEFT: -1}.get(d, 0) for d in DIRECTIONS], dtype=np.int32)
+DIRECTION_Y = np.array([{Direction.DOWN: 1, Direction.UP: -1}.get(d, 0) for d in DIRECTIONS], dtype=np.int32)
+OPPOSITE_DIRECTION = np.array([DIRECTIONS.index({Direction.RIGHT: Direction.LEFT,
+                                                 Direction.LEFT: Direction.RIGHT,
+                                                 Direction.UP: Direction.DOWN,
+                                                 Direction.DOWN: Direction.UP}[d]) for d in DIRECTIONS], dtype=np.int8)
+
+# Action, which keeps the snake's current direction
+KEEP_DIRECTION = -1
+
+
+class BatchBrain:
+    """
+    Vectorized game brain class to advance many independent games at once.
+
+    The batch brain stores N game boards in NumPy arrays and applies the rules of the game brain
+    (turning, moving, border and self collisions, eating, superfood lifetime and food generation)
+    to all the boards with array operations, which makes it suitable for e.g. reinforcement learning.
+
+    Every board stores:
+        * occupancy grid of the game area (borders excluded),
+        * snake's body as a ring buffer of game area cell indices along with the head and tail indices,
+        * snake's head coordinates, direction and length,
+        * food's cell, score and lifetime,
+        * game status, current score and high score.
+
+    Game area cells are indexed row by row: index = (y - top_border) * game_area_width + (x - left_border).
+    Coordinates are measured in in-game blocks the same way as in the game brain (borders included).
+    """
+
+    def __init__(self, board_count: int, game_area_width: int, game_area_height: int, border_widths: list[int],
+                 seed: int = None):
+        """
+        Batch Brain constructor method.
+
+        :param board_count: The amount of game boards to advance at once.
+        :param game_area_width: The total amount of in-game blocks that the game area is wide (borders excluded).
+        :param game_area_height: The total amount of in-game block that the game area is high (borders excluded).
+        :param border_widths: The width of the border measured in in-game blocks.
+                              Widths for borders are taken in the following order: [top, bottom, left, right],
+                              all missing values default to 2.
+        :param seed: Seed for the random number generator (food generation and starting directions).
+        """
+        border_widths = (border_widths + [2] * 4)[:4]  # Fill the missing positions with the default value 2
+        self.top_border, self.bottom_border, self.left_border, self.right_border = border_widths
+
+        self.game_area_width = game_area_width
+        self.game_area_height = game_area_height
+
+        self.display_width = self.left_border + game_area_width + self.right_border  # total width of the display
+        self.display_height = self.top_border + game_area_height + self.bottom_border  # total height of the display
+
+        if self.game_area_width < 2 or self.game_area_height < 2:
+            raise ValueError("Game field area is too small, there must be at least 2x2 blocks inside the borders.")
+
+        self.board_count = board_count
+        self.cell_count = game_area_width * game_area_height
+        self.rng = np.random.default_rng(seed)
+
+        n = board_count
+        self.occupancy = np.zeros((n, self.cell_count), dtype=np.bool_)
+        # Ring buffer can hold one extra position, as the head is stored even when colliding into a full board
+        self.body = np.zeros((n, self.cell_count + 1), dtype=np.int32)
+        self.head_index = np.zeros(n, dtype=np.int32)
+        self.tail_index = np.zeros(n, dtype=np.int32)
+        self.head_x = np.zeros(n, dtype=np.int32)
+        self.head_y = np.zeros(n, dtype=np.int32)
+        self.direction = np.zeros(n, dtype=np.int8)
+        self.length = np.zeros(n, dtype=np.int32)  # Includes the duplicate tail position after growing
+        self.growth_pending = np.zeros(n, dtype=np.bool_)  # Tail position is duplicated (snake has just grown)
+
+        self.food_cell = np.full(n, -1, dtype=np.int32)  # -1 if there is no food on the board
+        self.food_score = np.zeros(n, dtype=np.int32)
+        self.food_lifetime = np.full(n, -1, dtype=np.int32)  # -1 if the food remains on the board indefinitely
+
+        self.game_status = np.full(n, GameStatus.ONGOING.value, dtype=np.int8)
+        self.current_score = np.zeros(n, dtype=np.int64)
+        self.high_score = np.zeros(n, dtype=np.int64)
+
+        self.restart_games()
+
+    def restart_games(self, boards=None) -> None:
+        """
+        Start new games on the given boards.
+
+        Update the high scores, reset the current scores, create new snakes in the center of the boards
+        moving in random directions and generate new foods.
+
+        :param boards: Boolean mask or indices of the boards to restart. If set to None (default), all boards restart.
+        """
+        rows = np.arange(self.board_count) if boards is None else self._rows(boards)
+        if rows.size == 0:
+            return
+
+        self.high_score[rows] = np.maximum(self.high_score[rows], self.current_score[rows])
+        self.current_score[rows] = 0
+        self.game_status[rows] = GameStatus.ONGOING.value
+
+        start_x, start_y = self.display_width // 2, self.display_height // 2
+        start_cell = self.position_to_cell(start_x, start_y)
+        self.occupancy[rows] = False
+        self.occupancy[rows, start_cell] = True
+        self.body[rows, 0] = start_cell
+        self.head_index[rows] = 0
+        self.tail_index[rows] = 0
+        self.head_x[rows] = start_x
+        self.head_y[rows] = start_y
+        self.direction[rows] = self.rng.integers(len(DIRECTIONS), size=rows.size)
+        self.length[rows] = 1
+        self.growth_pending[rows] = False
+
+        self.generate_food(rows)
+
+    def step(self, actions) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Advance every ongoing game by one step.
+
+        Each step (for every board at once):
+            * turns the snake, if the action is a valid direction change,
+            * moves the snake and ends the game, if the snake collided with a border or itself,
+            * grows the snake and generates new food, if the snake reached the food,
+            * otherwise decreases the superfood's lifetime and generates new food, if the lifetime has run out.
+
+        Boards, where the game has already ended, are not affected.
+
+        :param actions: Array of direction indices (see DIRECTIONS) for every board,
+                        KEEP_DIRECTION (-1) keeps the snake's current direction.
+        :return: Points scored during the step and a boolean mask of the boards, where the game ended during the step.
+        """
+        actions = np.asarray(actions)
+        active = self.game_status == GameStatus.ONGOING.value
+        rows = np.nonzero(active)[0]
+
+        self.change_direction(rows, actions[rows])
+        finished_rows = self.snake_move(rows)
+        points = self.snake_move_effects(rows)
+
+        finished = np.zeros(self.board_count, dtype=np.bool_)
+        finished[finished_rows] = True
+        return points, finished
+
+    def change_direction(self, rows: np.ndarray, actions: np.ndarray) -> None:
+        """
+        Turn the snakes on the given boards.
+
+        A snake which is 1 block long can turn to any direction,
+        longer snakes can't turn to the opposite of their current direction.
+
+        :param rows: Indices of the boards.
+        :param actions: Direction indices for the boards, KEEP_DIRECTION (-1) keeps the current direction.
+        """
+        current = self.direction[rows]
+        opposite = OPPOSITE_DIRECTION[current]
+        valid = (actions >= 0) & ((self.length[rows] == 1) | ((actions != current) & (actions != opposite)))
+        self.direction[rows[valid]] = actions[valid]
+
+    def snake_move(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Move the snakes on the given boards and end the games, where the snake collided.
+
+        The tail is removed before the head is added, so the snake can follow its own tail without a collision.
+        If the snake has just grown, the tail stays in place (the duplicate tail position is removed).
+
+        :param rows: Indices of the boards.
+        :return: Indices of the boards, where the game ended.
+        """
+        direction = self.direction[rows]
+        new_x = self.head_x[rows] + DIRECTION_X[direction]
+        new_y = self.head_y[rows] + DIRECTION_Y[direction]
+        self.head_x[rows] = new_x
+        self.head_y[rows] = new_y
+
+        # Remove the tail (or the duplicate tail position of a snake that has just grown)
+        moving_tail = rows[~self.growth_pending[rows]]
+        self.occupancy[moving_tail, self.body[moving_tail, self.tail_index[moving_tail]]] = False
+        self.tail_index[moving_tail] = (self.tail_index[moving_tail] + 1) % self.body.shape[1]
+        self.growth_pending[rows] = False
+
+        # Border collision
+        in_area = self.in_game_area(new_x, new_y)
+        collided = ~in_area
+
+        # Self collision (the head moves to a position, that is still occupied by the body)
+        area_rows = rows[in_area]
+        new_cells = self.position_to_cell(new_x[in_area], new_y[in_area])
+        collided[in_area] = self.occupancy[area_rows, new_cells]
+
+        # Add the new head
+        head_index = (self.head_index[area_rows] + 1) % self.body.shape[1]
+        self.head_index[area_rows] = head_index
+        self.body[area_rows, head_index] = new_cells
+        self.occupancy[area_rows, new_cells] = True
+
+        finished_rows = rows[collided]
+        self.end_games(finished_rows)
+        return finished_rows
+
+    def snake_move_effects(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Apply the effects of the move on the given boards: eating the food or decreasing the superfood's lifetime.
+
+        :param rows: Indices of the boards.
+        :return: Points scored on every board.
+        """
+        points = np.zeros(self.board_count, dtype=np.int64)
+
+        food_cell = self.food_cell[rows]
+        in_area = self.in_game_area(self.head_x[rows], self.head_y[rows])
+        head_cell = self.position_to_cell(self.head_x[rows], self.head_y[rows])
+        eating = in_area & (food_cell >= 0) & (head_cell == food_cell)
+
+        # Grow the snake and add the food's score points to the current score
+        eating_rows = rows[eating]
+        self.growth_pending[eating_rows] = True
+        self.length[eating_rows] += 1
+        points[eating_rows] = self.food_score[eating_rows]
+        self.current_score[eating_rows] += self.food_score[eating_rows]
+        self.food_cell[eating_rows] = -1
+        self.food_lifetime[eating_rows] = -1
+        regenerate = eating_rows[self.length[eating_rows] < self.cell_count]
+
+        # Decrease the superfood's lifetime
+        aging_rows = rows[~eating & (self.food_lifetime[rows] > 0)]
+        self.food_lifetime[aging_rows] -= 1
+        expired_rows = aging_rows[self.food_lifetime[aging_rows] == 0]
+
+        self.generate_food(np.concatenate([regenerate, expired_rows]))
+        return points
+
+    def generate_food(self, rows: np.ndarray) -> None:
+        """
+        Generate new foods on the given boards in random free cells.
+
+        Every free cell of a board has an equal chance of being selected.
+
+        There is a 15% chance of generating a superfood, that is worth more points and has a lifetime of 100 steps:
+            10% chance - Food is generated that is worth 5 points,
+            4% chance - Food is generated that is worth 10 points,
+            1% chance - Food is generated that is worth 50 points.
+
+        :param rows: Indices of the boards.
+        """
+        if rows.size == 0:
+            return
+
+        free = ~self.occupancy[rows]
+        free_counts = free.sum(axis=1)
+        selected = np.floor(self.rng.random(rows.size) * free_counts).astype(np.int64)
+        self.food_cell[rows] = np.argmax(np.cumsum(free, axis=1) > selected[:, None], axis=1)
+
+        rand_value = self.rng.random(rows.size)
+        self.food_score[rows] = np.select([rand_value < 0.01, rand_value < 0.05, rand_value < 0.15], [50, 10, 5], 1)
+        self.food_lifetime[rows] = np.where(rand_value < 0.15, 100, -1)
+
+    def end_games(self, rows: np.ndarray) -> None:
+        """
+        Change the game status on the given boards to Lost or Won.
+
+        The game is won, if the snake has reached the game area's maximum capacity.
+
+        :param rows: Indices of the boards.
+        """
+        self.game_status[rows] = np.where(self.length[rows] >= self.cell_count,
+                                          GameStatus.WON.value, GameStatus.LOST.value)
+
+    def in_game_area(self, x, y):
+        """Check if the coordinates (x, y) measured in in-game blocks are inside the game area (borders excluded)."""
+        return ((x >= self.left_border) & (x < self.display_width - self.right_border) &
+                (y >= self.top_border) & (y < self.display_height - self.bottom_border))
+
+    def position_to_cell(self, x, y):
+        """Convert the coordinates (x, y) measured in in-game blocks to game area cell indices."""
+        return (y - self.top_border) * self.game_area_width + (x - self.left_border)
+
+    def cell_to_position(self, cell):
+        """Convert the game area cell indices to coordinates (x, y) measured in in-game blocks."""
+        return cell % self.game_area_width + self.left_border, cell // self.game_area_width + self.top_border
+
+    def get_body_positions(self, board: int) -> list[tuple[int, int]]:
+        """
+        Get the snake's body positions (x, y) on the given board, from the head to the tail.
+
+        :param board: Index of the board.
+        """
+        capacity = self.body.shape[1]
+        stored = (self.head_index[board] - self.tail_index[board]) % capacity + 1
+        indices = (self.head_index[board] - np.arange(stored)) % capacity
+        xs, ys = self.cell_to_position(self.body[board, indices])
+        return list(zip(xs.tolist(), ys.tolist()))
+
+    def get_food_position(self, board: int):
+        """Get the position (x, y) of the food on the given board, or None if there is no food."""
+        if self.food_cell[board] < 0:
+            return None
+        x, y = self.cell_to_position(int(self.food_cell[board]))
+        return x, y
+
+    def _rows(self, boards) -> np.ndarray:
+        """Convert a boolean mask or indices of the boards to an array of board indices."""
+        boards = np.asarray(boards)
+        if boards.dtype == np.bool_:
+            return np.nonzero(boards)[0]
+        return boards.astype(np.int64, copy=False)
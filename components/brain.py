@@ -1,8 +1,22 @@
 import random
+from typing import NamedTuple
 
 from enums.game_status import GameStatus
-from components.snake import Snake
+from components.snake import Snake, SnakeSnapshot
 from components.food import Food
+from utils.bitboard import FreeCellBitboard
+from utils.free_cell_index import FreeCellIndex
+
+
+class BrainSnapshot(NamedTuple):
+    """Mutable state of the game brain (see Brain.snapshot)."""
+    snake: SnakeSnapshot
+    food: tuple  # Food's x and y coordinates, score and lifetime, or None if there is no food
+    current_score: int
+    high_score: int
+    game_status: GameStatus
+    game_paused: bool
+    rng_state: tuple
 
 
 class Brain:
@@ -26,7 +40,8 @@ class Brain:
     (the game is intended to be pixelated).
     """
 
-    def __init__(self, game_area_width: int, game_area_height: int, border_widths: list[int]):
+    def __init__(self, game_area_width: int, game_area_height: int, border_widths: list[int], seed: int = None,
+                 bitboard: bool = False, feature_planes: bool = False):
         """
         Game Brain constructor method.
 
@@ -35,6 +50,15 @@ class Brain:
         :param border_widths: The width of the border measured in in-game blocks.
                               Widths for borders are taken in the following order: [top, bottom, left, right],
                               all missing values default to 2.
+        :param seed: Seed of the game's random number generator (snake's starting direction and food generation).
+                     If a seed is not provided, a random seed is used.
+                     Each following game is seeded from the previous game's random number generator,
+                     so every game can be reproduced from its own seed.
+        :param bitboard: If set to True, the free positions are tracked with a bitboard (one bit per position),
+                         which supports word-parallel free space and reachability queries (e.g. for AI agents).
+                         Otherwise (default), only the occupied positions are tracked.
+        :param feature_planes: If set to True, grid planes of the game board (head, body, food and walls)
+                               are kept up to date for agents (see FeaturePlanes, requires NumPy).
         """
         border_widths = (border_widths + [2] * 4)[:4]  # Fill the missing positions with the default value 2
         self.top_border, self.bottom_border, self.left_border, self.right_border = border_widths
@@ -48,9 +72,6 @@ class Brain:
         if self.game_area_width < 2 or self.game_area_height < 2:
             raise ValueError("Game field area is too small, there must be at least 2x2 blocks inside the borders.")
 
-        self.game_area_positions = set((x, y) for x in range(self.left_border, self.display_width - self.right_border)
-                                       for y in range(self.top_border, self.display_height - self.bottom_border))
-
         self.game_paused = True
         self.game_status = GameStatus.ONGOING
         self.game_quit = False
@@ -58,12 +79,46 @@ class Brain:
         self.current_score = 0  # Points collected during the current game
         self.high_score = 0  # Highest number of points collected during the current session
 
+        self.seed = None  # Seed of the current game
+        self.rng = None  # Random number generator of the current game
+        self.seed_game(seed if seed is not None else random.getrandbits(64))
+
+        # Undo points, each of them stores the state at the time it was added (see push_undo_point)
+        self.undo_log = []
+
+        self.bitboard = bitboard
+        self.free_cells = None  # Index of the game area positions, that are not occupied by the snake
+
+        self.feature_planes = None  # Grid planes of the game board, that are updated as the game changes
+        if feature_planes:
+            from utils.feature_planes import FeaturePlanes  # NumPy is only required, if the planes are used
+            self.feature_planes = FeaturePlanes(self.display_width, self.display_height, self.get_borders())
         self.snake = self.new_snake()
         self.food = self.generate_food()
 
+    def seed_game(self, seed: int) -> None:
+        """
+        Seed the random number generator of the game.
+
+        :param seed: Seed of the game.
+        """
+        self.seed = seed
+        self.rng = random.Random(seed)
+
     def new_snake(self) -> Snake:
-        """Create a new snake that will start in the center of the game board, moving in a random direction."""
-        return Snake(self.display_width // 2, self.display_height // 2)
+        """
+        Create a new snake that will start in the center of the game board, moving in a random direction.
+
+        The free cell index is rebuilt for the new snake, which keeps it up to date while moving and growing.
+        The feature planes (if used) observe the new snake's body.
+        """
+        free_cells_type = FreeCellBitboard if self.bitboard else FreeCellIndex
+        self.free_cells = free_cells_type(self.left_border, self.top_border, self.game_area_width, self.game_area_height)
+        snake = Snake(self.display_width // 2, self.display_height // 2, free_cells=self.free_cells, rng=self.rng)
+        if self.feature_planes is not None:
+            self.feature_planes.snake = snake
+            snake.attach_body_observer(self.feature_planes)
+        return snake
 
     def snake_at_max_capacity(self) -> bool:
         """Check if the snake has reached the maximum capacity of the game board."""
@@ -150,6 +205,9 @@ class Brain:
         :return: Generated food object.
         """
 
+        if self.undo_log and self.undo_log[-1][-1] is None:
+            self.undo_log[-1][-1] = self.rng.getstate()  # Random number generator is used since the undo point
+
         x_coordinate, y_coordinate = self.select_random_position()
 
         # Default food score
@@ -157,7 +215,7 @@ class Brain:
         lifetime = 100
 
         # Random chance for special food
-        rand_value = random.random()  # Generates a float between 0.0 and 1.0
+        rand_value = self.rng.random()  # Generates a float between 0.0 and 1.0
         if rand_value < 0.01:  # 1% chance for 50 points
             score = 50
         elif rand_value < 0.05:  # 4% chance for 10 points (totaling 5% with the previous chance)
@@ -168,15 +226,30 @@ class Brain:
             lifetime = None
 
         self.food = Food(x_coordinate, y_coordinate, score, lifetime)
+        self.update_food_plane()
         return self.food
 
+    def update_food_plane(self) -> None:
+        """Move the food on the feature planes (if they are used) to the current food's position."""
+        if self.feature_planes is not None:
+            self.feature_planes.set_food(None if self.food is None else self.food.get_position())
+
     def select_random_position(self) -> tuple[int, int]:
-        """Select a random available position (x, y) on the game board, e.g. for food generation."""
-        return random.choice(list(self.get_free_positions()))
+        """
+        Select a random available position (x, y) on the game board, e.g. for food generation.
+
+        Every free position has an equal chance of being selected.
+        """
+        return self.free_cells.random_position(self.rng)
 
     def get_free_positions(self) -> set[tuple[int, int]]:
-        """Get a set of the available coordinates on the game board, that are not occupied by the snake's body."""
-        return self.game_area_positions - set(self.snake.body_positions)
+        """
+        Get a set of the available coordinates on the game board, that are not occupied by the snake's body.
+
+        The game area is not stored position by position, so building the set takes time proportional to its size.
+        To check or count the free positions, use the free cell index (free_cells) instead.
+        """
+        return set(self.free_cells)
 
     def snake_collision_detection(self) -> bool:
         """
@@ -194,18 +267,22 @@ class Brain:
 
         :return: Boolean value to represent if a border collision incurred.
         """
-        head_x, head_y = self.snake.body_positions[0]
-        return (head_x < 0 + self.left_border or
-                head_x >= self.display_width - self.right_border or
-                head_y < 0 + self.top_border or
-                head_y >= self.display_height - self.bottom_border)
+        return not self.in_game_area(self.snake.body_positions[0])
+
+    def in_game_area(self, position: tuple[int, int]) -> bool:
+        """Check if the position (x, y) is inside the game area (borders excluded)."""
+        x, y = position
+        return (self.left_border <= x < self.display_width - self.right_border and
+                self.top_border <= y < self.display_height - self.bottom_border)
 
     def snake_eating_detection(self) -> bool:
         """
         Check if the snake's head's position matches the food's position.
 
-        :return: Boolean for whether the snake reached the food.
+        :return: Boolean for whether the snake reached the food (False if there is no food on the board).
         """
+        if self.food is None:  # No food is generated, once the snake has filled the game area
+            return False
         return self.snake.body_positions[0] == (self.food.x_coordinate, self.food.y_coordinate)
 
     def snake_eat(self) -> None:
@@ -213,8 +290,10 @@ class Brain:
         self.snake.grow()
         self.current_score += self.food.score
         self.food = None
+        self.update_food_plane()
 
     def snake_move(self) -> None:
+        self.snake.apply_queued_direction()
         self.snake.move()
 
         if self.snake_collision_detection():
@@ -230,7 +309,7 @@ class Brain:
             if not self.snake_at_max_capacity():
                 self.generate_food()
 
-        elif self.food.lifetime is not None:
+        elif self.food is not None and self.food.lifetime is not None:
             self.food.decrease_lifetime()
             if self.food.lifetime == 0:
                 self.generate_food()
@@ -240,18 +319,89 @@ class Brain:
         self.pause_game()
         self.end_game()
 
-    def restart_game(self) -> None:
+    def restart_game(self, seed: int = None) -> None:
         """
         Start a new game.
 
         Finish up the previous game round by updating the high score, if necessary and
         reset the score for the new game.
+        Seed the new game from the previous game's random number generator (unless a seed is provided).
         Create a new snake, that will start from the middle of the board in a random direction.
         Pause the game, to prevent the next game from playing straight away.
+
+        :param seed: Seed of the new game. A game started with a seed plays out the same way
+                     as the first game of a brain created with the seed.
         """
         self.set_high_score()
         self.reset_score()
+        self.seed_game(seed if seed is not None else self.rng.getrandbits(64))
+        self.undo_log.clear()
         self.snake = self.new_snake()
         self.food = self.generate_food()
         self.pause_game()
         self.start_game()
+
+    def snapshot(self) -> BrainSnapshot:
+        """
+        Capture the mutable state of the game (snake, food, scores, game status and random number generator).
+
+        The snapshot's size is proportional to the snake's length, not to the size of the game board,
+        as the game area and the free positions are derived from the snake when restoring.
+        """
+        food = self.food
+        food_state = None if food is None else (food.x_coordinate, food.y_coordinate, food.score, food.lifetime)
+        return BrainSnapshot(self.snake.snapshot(),
+                             food_state,
+                             self.current_score,
+                             self.high_score,
+                             self.game_status,
+                             self.game_paused,
+                             self.rng.getstate())
+
+    def restore(self, snapshot: BrainSnapshot) -> None:
+        """
+        Restore the state of the game from the snapshot. Undo points are discarded.
+
+        :param snapshot: Snapshot of a game brain's state with the same game board measurements.
+        """
+        self.snake.restore(snapshot.snake)
+        self.food = None if snapshot.food is None else Food(*snapshot.food)
+        self.update_food_plane()
+        self.current_score = snapshot.current_score
+        self.high_score = snapshot.high_score
+        self.game_status = snapshot.game_status
+        self.game_paused = snapshot.game_paused
+        self.rng.setstate(snapshot.rng_state)
+        self.undo_log.clear()
+
+    def push_undo_point(self) -> None:
+        """
+        Start recording the changes of the game, so they can be rolled back with undo().
+
+        Only the scalar state is stored straight away, the snake records its moves as they happen and
+        the random number generator's state is stored only once food is generated.
+        Undo points can be nested, undo() rolls back the changes made since the latest undo point,
+        which is e.g. cheaper than restoring a snapshot for trying out a step during a lookahead search.
+        """
+        food = self.food
+        self.undo_log.append([self.current_score, self.game_status, self.game_paused,
+                              food, None if food is None else food.lifetime, None])
+        self.snake.push_undo_point()
+
+    def undo(self) -> None:
+        """
+        Roll back the changes made since the latest undo point and remove the undo point.
+
+        :raises IndexError: If there are no undo points.
+        """
+        current_score, game_status, game_paused, food, food_lifetime, rng_state = self.undo_log.pop()
+        self.snake.undo()
+        self.current_score = current_score
+        self.game_status = game_status
+        self.game_paused = game_paused
+        self.food = food
+        self.update_food_plane()
+        if food is not None:
+            food.lifetime = food_lifetime
+        if rng_state is not None:
+            self.rng.setstate(rng_state)
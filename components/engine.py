@@ -0,0 +1,78 @@
+from typing import Callable, Optional
+
+from components.brain import Brain
+from enums.direction import Direction
+from enums.game_status import GameStatus
+
+# A policy decides the snake's next direction based on the game brain (None keeps the current direction)
+Policy = Callable[[Brain], Optional[Direction]]
+
+
+class Engine:
+    """
+    Headless game engine class to advance the game without displaying it.
+
+    The engine drives the game brain the same way the game loop does (change direction, move, apply the move's
+    effects), but without pygame, a window or a frame rate limit, so the game advances as fast as possible.
+    This makes it usable for simulations, e.g. bot evaluation and game balancing.
+    """
+
+    def __init__(self, brain: Brain, recorder=None):
+        """
+        Engine constructor method.
+
+        :param brain: Game brain, which stores the state of the game that the engine advances.
+        :param recorder: Replay recorder, that records every step of the game (optional).
+        """
+        self.brain = brain
+        self.recorder = recorder
+        self.steps = 0  # Steps taken during the current game
+        self.brain.unpause_game()
+
+    def reset(self, seed: int = None) -> None:
+        """
+        Start a new game and un-pause it straight away.
+
+        :param seed: Seed of the new game. If not provided, the game is seeded from the previous game.
+        """
+        self.brain.restart_game(seed)
+        self.brain.unpause_game()
+        self.steps = 0
+
+    def step(self, action: Direction = None) -> GameStatus:
+        """
+        Advance the game by one step.
+
+        If the game has already ended, the step has no effect.
+
+        :param action: Direction to turn the snake to before moving (None keeps the current direction).
+        :return: Game status after the step.
+        """
+        brain = self.brain
+        if brain.game_status is not GameStatus.ONGOING:
+            return brain.game_status
+
+        if action is not None:
+            brain.snake.change_direction(action)
+        brain.snake_move()
+        brain.snake_move_effects()
+        self.steps += 1
+        if self.recorder is not None:
+            self.recorder.record_tick()
+        return brain.game_status
+
+    def run(self, policy: Policy, max_steps: int = None) -> GameStatus:
+        """
+        Play the game with the policy until the game ends or the step limit is reached.
+
+        :param policy: Function, that returns the direction for the next step based on the game brain.
+        :param max_steps: Maximum amount of steps to take. If set to None (default), the game is played until it ends.
+        :return: Game status after the last step.
+        """
+        brain = self.brain
+        step = self.step
+        steps_left = -1 if max_steps is None else max_steps
+        while steps_left != 0 and brain.game_status is GameStatus.ONGOING:
+            step(policy(brain))
+            steps_left -= 1
+        return brain.game_status
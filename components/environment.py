@@ -0,0 +1,196 @@
+import numpy as np
+
+from components.brain import Brain
+from components.engine import Engine
+from components.snake import Snake
+from enums.direction import Direction
+from enums.game_status import GameStatus
+from enums.observation_mode import ObservationMode
+
+# Directions in the order of their action indices (the same order as in the batch brain)
+ACTIONS = list(Direction)
+
+# Channels of the plane observations
+HEAD_PLANE, BODY_PLANE, FOOD_PLANE, WALL_PLANE = range(4)
+PLANE_COUNT = 4
+
+# Features of the vector observations: danger in each of the action directions (4), the snake's direction (4),
+# the food's offset from the head relative to the game area size (2) and the snake's length relative to the area (1)
+VECTOR_SIZE = 11
+
+
+class SnakeEnv:
+    """
+    Game environment class for reinforcement learning, with a Gymnasium-style API on top of the game brain.
+
+    reset(seed) starts a new game and step(action) advances it by one step, returning the tuple
+    (observation, reward, terminated, truncated, info). Actions are the indices of the directions in ACTIONS.
+
+    The observation is written into a buffer, that is allocated once and updated in place on every step,
+    so the environment does not allocate arrays per step. The same buffer is returned every time:
+    copy it, if the previous observations have to be kept (e.g. in a replay buffer).
+
+    Observation modes:
+        * PLANES - float32 array (PLANE_COUNT, display_height, display_width) with the planes of the snake's head,
+                   the snake's body, the food and the walls (borders). The planes are kept up to date
+                   by the brain (see FeaturePlanes), only the cells, that changed during the step
+                   (the head, the tail and the food), are copied into the observation.
+        * VECTOR - float32 array (VECTOR_SIZE,) with compact features around the snake's head.
+    """
+
+    def __init__(self, game_area_width: int = 20, game_area_height: int = 20, border_widths: list[int] = None,
+                 observation_mode: ObservationMode = ObservationMode.PLANES, max_steps: int = None,
+                 death_reward: float = -1.0, seed: int = None):
+        """
+        Snake Environment constructor method.
+
+        :param game_area_width: The total amount of in-game blocks that the game area is wide (borders excluded).
+        :param game_area_height: The total amount of in-game block that the game area is high (borders excluded).
+        :param border_widths: The width of the border measured in in-game blocks (see Brain).
+        :param observation_mode: Format of the observations.
+        :param max_steps: Maximum amount of steps per game, after which the game is truncated.
+                          If set to None (default), the games are not truncated.
+        :param death_reward: Reward for losing the game (added to the points of the last step).
+        :param seed: Seed of the first game (see Brain).
+        """
+        self.brain = Brain(game_area_width, game_area_height, border_widths or [], seed=seed,
+                           feature_planes=observation_mode == ObservationMode.PLANES)
+        self.engine = Engine(self.brain)
+        self.observation_mode = observation_mode
+        self.max_steps = max_steps
+        self.death_reward = death_reward
+
+        if observation_mode == ObservationMode.PLANES:
+            self.observation = np.zeros((PLANE_COUNT, self.brain.display_height, self.brain.display_width),
+                                        dtype=np.float32)
+            self.observation[WALL_PLANE] = self.brain.feature_planes.walls
+        else:
+            self.observation = np.zeros(VECTOR_SIZE, dtype=np.float32)
+
+        self.info = {"score": 0, "length": 1, "steps": 0, "game_status": GameStatus.ONGOING}
+        self.update_observation()
+
+    def reset(self, seed: int = None) -> tuple[np.ndarray, dict]:
+        """
+        Start a new game.
+
+        :param seed: Seed of the new game. If not provided, the game is seeded from the previous game.
+        :return: Observation of the new game and the info dictionary.
+        """
+        self.engine.reset(seed)
+        self.update_observation()
+        return self.observation, self.update_info()
+
+    def step(self, action: int) -> tuple[np.ndarray, float, bool, bool, dict]:
+        """
+        Turn the snake to the action's direction and advance the game by one step.
+
+        Turning back (the opposite of the current direction) is ignored, the snake keeps its direction.
+
+        :param action: Index of the direction in ACTIONS.
+        :return: Tuple (observation, reward, terminated, truncated, info):
+                 reward - points scored during the step (plus the death reward, if the game was lost),
+                          0 if the game had already ended before the step (reset the environment),
+                 terminated - whether the game has ended,
+                 truncated - whether the step limit has been reached before the game ended.
+        """
+        brain = self.brain
+        if brain.game_status is not GameStatus.ONGOING:  # The game has ended, until the environment is reset
+            return self.observation, 0.0, True, False, self.update_info()
+
+        snake = brain.snake
+        previous_score = brain.current_score
+        previous_head, previous_tail = snake.get_head_position(), snake.get_tail_position()
+        previous_food = None if brain.food is None else brain.food.get_position()
+
+        game_status = self.engine.step(ACTIONS[action])
+
+        reward = float(brain.current_score - previous_score)
+        terminated = game_status is not GameStatus.ONGOING
+        if game_status is GameStatus.LOST:
+            reward += self.death_reward
+        truncated = not terminated and self.max_steps is not None and self.engine.steps >= self.max_steps
+
+        if self.observation_mode == ObservationMode.PLANES:
+            self.update_planes((previous_head, previous_tail, previous_food, snake.get_head_position(),
+                                None if brain.food is None else brain.food.get_position()))
+        else:
+            self.update_vector()
+        return self.observation, reward, terminated, truncated, self.update_info()
+
+    # ---------------------------------------- OBSERVATIONS ----------------------------------------
+
+    def update_observation(self) -> None:
+        """Write the observation of the current state of the game from scratch."""
+        if self.observation_mode == ObservationMode.VECTOR:
+            self.update_vector()
+            return
+
+        planes = self.brain.feature_planes
+        observation = self.observation
+        np.copyto(observation[HEAD_PLANE], planes.head)
+        np.greater(planes.occupancy, 0, out=observation[BODY_PLANE])
+        np.copyto(observation[FOOD_PLANE], planes.food)
+
+    def update_planes(self, positions: tuple) -> None:
+        """
+        Copy the cells of the feature planes, that could have changed during the step, into the observation.
+
+        During a step the head moves to a new cell and the tail leaves its cell (unless the snake has grown),
+        so only the previous and the new head cells, the previous tail cell and the previous and the new food cells
+        change, which keeps the update independent of the board's size.
+
+        :param positions: Positions (x, y) of the changed cells (None and positions beyond the display are ignored).
+        """
+        planes = self.brain.feature_planes
+        observation = self.observation
+        for position in positions:
+            if position is None or not planes.in_grid(position):
+                continue
+            x, y = position
+            observation[HEAD_PLANE, y, x] = planes.head[y, x]
+            observation[BODY_PLANE, y, x] = planes.occupancy[y, x] > 0
+            observation[FOOD_PLANE, y, x] = planes.food[y, x]
+
+    def update_vector(self) -> None:
+        """Write the features around the snake's head into the vector observation."""
+        brain = self.brain
+        snake = brain.snake
+        vector = self.observation
+        head_x, head_y = snake.get_head_position()
+
+        for index, direction in enumerate(ACTIONS):
+            move_x, move_y = Snake.DIRECTION_MOVES[direction]
+            vector[index] = self.is_collision((head_x + move_x * snake.step, head_y + move_y * snake.step))
+            vector[4 + index] = snake.direction is direction
+
+        if brain.food is None:
+            vector[8] = vector[9] = 0
+        else:
+            food_x, food_y = brain.food.get_position()
+            vector[8] = (food_x - head_x) / brain.game_area_width
+            vector[9] = (food_y - head_y) / brain.game_area_height
+        vector[10] = snake.length() / (brain.game_area_width * brain.game_area_height)
+
+    def is_collision(self, position: tuple[int, int]) -> bool:
+        """
+        Check if the snake's head would collide with a border or the snake's body at the position in the next step.
+
+        The tail moves away during the step, unless the snake has just grown (the tail position is duplicated).
+        """
+        brain = self.brain
+        snake = brain.snake
+        if not brain.in_game_area(position):
+            return True
+        return snake.is_occupied(position) and (position != snake.get_tail_position() or
+                                                 snake.occupancy[position] > 1)
+
+    def update_info(self) -> dict:
+        """Update the info dictionary (reused between the steps) with the state of the game."""
+        brain = self.brain
+        info = self.info
+        info["score"] = brain.current_score
+        info["length"] = brain.snake.length()
+        info["steps"] = self.engine.steps
+        info["game_status"] = brain.game_status
+        return info
@@ -0,0 +1,285 @@
+import struct
+import zlib
+from bisect import bisect_right
+
+from components.brain import Brain, BrainSnapshot
+from components.engine import Engine
+from components.snake import Snake, SnakeSnapshot
+from enums.direction import Direction
+from enums.game_status import GameStatus
+
+# Relative turns in the order of their 2-bit codes (keeping the direction counts as going straight)
+TURNS = {
+    Direction.RIGHT: [Direction.RIGHT, Direction.UP, Direction.DOWN, Direction.LEFT],
+    Direction.LEFT: [Direction.LEFT, Direction.DOWN, Direction.UP, Direction.RIGHT],
+    Direction.UP: [Direction.UP, Direction.LEFT, Direction.RIGHT, Direction.DOWN],
+    Direction.DOWN: [Direction.DOWN, Direction.RIGHT, Direction.LEFT, Direction.UP],
+}
+TURN_CODES = {(direction, turn): code for direction, turns in TURNS.items() for code, turn in enumerate(turns)}
+
+# Directions in the order of their 2-bit codes, that describe the snake's body segments in keyframes
+DIRECTIONS = list(Direction)
+
+REPLAY_MAGIC = b"SNKR"
+REPLAY_VERSION = 2
+# Magic, version, game area width and height, borders (top, bottom, left, right), seed, tick count,
+# size of the compressed turn codes, keyframe count
+REPLAY_HEADER = struct.Struct("<4sBII4HQQII")
+# Tick and size of a keyframe (keyframes are stored one after another, following the turn codes)
+KEYFRAME_INDEX_ENTRY = struct.Struct("<QI")
+# Tick, current score, high score, game status, game paused, direction, food present, food x and y, food score,
+# food lifetime (-1 if None), body length (without the duplicate tail), tail x and y, tail duplicated (has grown)
+KEYFRAME_HEADER = struct.Struct("<QqqbBBBiiiiIiiB")
+# Random number generator's Mersenne Twister state (version 3), followed by a gauss_next flag and value
+RNG_STATE = struct.Struct("<625IBd")
+
+
+def encode_keyframe(brain: Brain, tick: int) -> bytes:
+    """
+    Encode the state of the game brain at the tick as a compressed keyframe.
+
+    The snake's body is stored as the tail position followed by 2-bit codes of the direction
+    from each body position towards the head.
+
+    :param brain: Game brain to encode.
+    :param tick: Tick of the game, that the state belongs to.
+    :return: Compressed keyframe.
+    """
+    snake = brain.snake
+    body_positions = list(snake.body_positions)
+    growth_pending = len(body_positions) > 1 and body_positions[-1] == body_positions[-2]
+    if growth_pending:
+        body_positions.pop()
+
+    codes = bytearray((len(body_positions) + 2) // 4)
+    for index in range(len(body_positions) - 1):
+        (x, y), (next_x, next_y) = body_positions[-1 - index], body_positions[-2 - index]
+        code = DIRECTIONS.index(direction_between(x, y, next_x, next_y, snake.step))
+        codes[index >> 2] |= code << ((index & 3) * 2)
+
+    food = brain.food
+    tail_x, tail_y = body_positions[-1]
+    header = KEYFRAME_HEADER.pack(tick, brain.current_score, brain.high_score, brain.game_status.value,
+                                  brain.game_paused, DIRECTIONS.index(snake.direction), food is not None,
+                                  food.x_coordinate if food else 0, food.y_coordinate if food else 0,
+                                  food.score if food else 0,
+                                  food.lifetime if food and food.lifetime is not None else -1,
+                                  len(body_positions), tail_x, tail_y, growth_pending)
+
+    version, internal_state, gauss_next = brain.rng.getstate()
+    rng_state = RNG_STATE.pack(*internal_state, gauss_next is not None, gauss_next or 0.0)
+    return zlib.compress(header + bytes(codes) + rng_state)
+
+
+def restore_keyframe(engine: Engine, keyframe: bytes) -> None:
+    """
+    Restore the state of the engine's game brain from the keyframe.
+
+    :param engine: Engine of the game, that the keyframe was recorded from.
+    :param keyframe: Compressed keyframe.
+    """
+    data = zlib.decompress(keyframe)
+    (tick, current_score, high_score, game_status, game_paused, direction, has_food, food_x, food_y, food_score,
+     food_lifetime, body_length, tail_x, tail_y, growth_pending) = KEYFRAME_HEADER.unpack_from(data)
+    codes = data[KEYFRAME_HEADER.size:KEYFRAME_HEADER.size + (body_length + 2) // 4]
+    rng_state = RNG_STATE.unpack_from(data, KEYFRAME_HEADER.size + len(codes))
+
+    brain = engine.brain
+    step = brain.snake.step
+    body_positions = [(tail_x, tail_y)] * (2 if growth_pending else 1)
+    x, y = tail_x, tail_y
+    for index in range(body_length - 1):
+        move_x, move_y = Snake.DIRECTION_MOVES[DIRECTIONS[(codes[index >> 2] >> ((index & 3) * 2)) & 3]]
+        x, y = x + move_x * step, y + move_y * step
+        body_positions.append((x, y))
+    body_positions.reverse()
+
+    food = (food_x, food_y, food_score, None if food_lifetime < 0 else food_lifetime) if has_food else None
+    rng_state = (3, rng_state[:625], rng_state[626] if rng_state[625] else None)
+    brain.restore(BrainSnapshot(SnakeSnapshot(tuple(body_positions), DIRECTIONS[direction]), food,
+                                current_score, high_score, GameStatus(game_status), bool(game_paused), rng_state))
+    engine.steps = tick
+
+
+def direction_between(x: int, y: int, next_x: int, next_y: int, step: int = 1) -> Direction:
+    """Get the direction from the position (x, y) to the neighbouring position (next_x, next_y)."""
+    for direction, (move_x, move_y) in Snake.DIRECTION_MOVES.items():
+        if (x + move_x * step, y + move_y * step) == (next_x, next_y):
+            return direction
+    raise ValueError(f"Positions ({x}, {y}) and ({next_x}, {next_y}) are not neighbouring body positions.")
+
+
+class ReplayRecorder:
+    """
+    Replay recorder class to record a game in a compact binary format.
+
+    The game is fully determined by its seed and the snake's direction at every tick,
+    so the recorder only stores the seed and the direction changes.
+    Every tick is stored as a 2-bit code of the snake's turn relative to its previous direction
+    (straight, left, right or back) and the codes are compressed, as snakes mostly move straight.
+
+    To seek inside long replays, the recorder also stores keyframes (the full state of the game) periodically.
+    The amount of keyframes is limited: once the limit is exceeded, every other keyframe is dropped
+    and the keyframe interval is doubled, which keeps the size of the replay bounded.
+    """
+
+    def __init__(self, brain: Brain, keyframe_interval: int = 4096, max_keyframes: int = 64):
+        """
+        Replay Recorder constructor method.
+
+        The recording starts from the current state of the brain, which should be a new game.
+
+        :param brain: Game brain of the game to record.
+        :param keyframe_interval: The amount of ticks between keyframes.
+        :param max_keyframes: The maximum amount of keyframes to keep.
+        """
+        self.brain = brain
+        self.seed = brain.seed
+        self.direction = brain.snake.direction  # Direction of the snake at the previous tick
+        self.tick_count = 0
+        self.codes = bytearray()  # 2-bit turn codes, 4 ticks per byte
+
+        self.keyframe_interval = keyframe_interval
+        self.max_keyframes = max_keyframes
+        self.keyframes = []  # Pairs of tick and compressed keyframe, in the order of ticks
+
+    def record_tick(self) -> None:
+        """Record the snake's direction after a tick (call after every step of the game)."""
+        direction = self.brain.snake.direction
+        code = TURN_CODES[self.direction, direction]
+        self.direction = direction
+
+        shift = (self.tick_count & 3) * 2
+        if shift == 0:
+            self.codes.append(code)
+        else:
+            self.codes[-1] |= code << shift
+        self.tick_count += 1
+
+        if self.tick_count % self.keyframe_interval == 0:
+            self.record_keyframe()
+
+    def record_keyframe(self) -> None:
+        """Store the state of the game at the current tick, thinning out the keyframes if there are too many."""
+        self.keyframes.append((self.tick_count, encode_keyframe(self.brain, self.tick_count)))
+        if len(self.keyframes) > self.max_keyframes:
+            self.keyframe_interval *= 2
+            self.keyframes = [(tick, keyframe) for tick, keyframe in self.keyframes
+                              if tick % self.keyframe_interval == 0]
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the replay in the binary format.
+
+        The replay consists of a header, the keyframe index, the compressed turn codes and the keyframes.
+        """
+        brain = self.brain
+        codes = zlib.compress(bytes(self.codes), 9)
+        header = REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, brain.game_area_width, brain.game_area_height,
+                                    brain.top_border, brain.bottom_border, brain.left_border, brain.right_border,
+                                    self.seed, self.tick_count, len(codes), len(self.keyframes))
+        index = b"".join(KEYFRAME_INDEX_ENTRY.pack(tick, len(keyframe)) for tick, keyframe in self.keyframes)
+        return b"".join([header, index, codes] + [keyframe for _, keyframe in self.keyframes])
+
+    def save(self, path: str) -> None:
+        """Write the replay to the file."""
+        with open(path, "wb") as replay_file:
+            replay_file.write(self.to_bytes())
+
+
+class ReplayPlayer:
+    """
+    Replay player class to rebuild a recorded game.
+
+    The game is re-simulated with the headless engine from the recorded seed and turns,
+    which is far faster than the game was played in real time.
+    Seeking to a tick restores the nearest keyframe before it and only simulates the remaining ticks.
+    """
+
+    def __init__(self, data: bytes):
+        """
+        Replay Player constructor method.
+
+        :param data: Replay encoded in the binary format.
+        :raises ValueError: If the data is not a supported replay.
+        """
+        if len(data) < REPLAY_HEADER.size:
+            raise ValueError("Invalid replay: the data is too short.")
+        (magic, version, self.game_area_width, self.game_area_height,
+         top_border, bottom_border, left_border, right_border,
+         self.seed, self.tick_count, codes_size, keyframe_count) = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError("Invalid replay: unsupported format or version.")
+        self.border_widths = [top_border, bottom_border, left_border, right_border]
+
+        offset = REPLAY_HEADER.size
+        index = [KEYFRAME_INDEX_ENTRY.unpack_from(data, offset + i * KEYFRAME_INDEX_ENTRY.size)
+                 for i in range(keyframe_count)]
+        offset += keyframe_count * KEYFRAME_INDEX_ENTRY.size
+
+        self.codes = zlib.decompress(data[offset:offset + codes_size])
+        offset += codes_size
+
+        self.keyframe_ticks = []
+        self.keyframes = []
+        for tick, size in index:
+            self.keyframe_ticks.append(tick)
+            self.keyframes.append(data[offset:offset + size])
+            offset += size
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayPlayer":
+        """Read the replay from the file."""
+        with open(path, "rb") as replay_file:
+            return cls(replay_file.read())
+
+    def new_engine(self) -> Engine:
+        """Create a headless engine with a new game, that is set up as the recorded game's start."""
+        return Engine(Brain(self.game_area_width, self.game_area_height, self.border_widths, seed=self.seed))
+
+    def ticks(self, start_tick: int = 0, end_tick: int = None):
+        """Iterate over the 2-bit turn codes of the ticks from the start tick until the end tick (exclusive)."""
+        codes = self.codes
+        end_tick = self.tick_count if end_tick is None else min(end_tick, self.tick_count)
+        for tick in range(start_tick, end_tick):
+            yield (codes[tick >> 2] >> ((tick & 3) * 2)) & 3
+
+    def seek(self, tick: int, engine: Engine = None) -> Engine:
+        """
+        Rebuild the game at the tick (after the given amount of ticks has been played).
+
+        The nearest keyframe at or before the tick is restored (unless the engine is already closer to the tick)
+        and the remaining ticks are simulated.
+
+        :param tick: Tick to seek to.
+        :param engine: Engine to reuse (if not provided, a new one is created).
+        :return: Engine with the game at the tick.
+        """
+        tick = max(0, min(tick, self.tick_count))
+        engine = engine or self.new_engine()
+        if engine.steps > tick:
+            engine = self.new_engine()
+
+        keyframe_position = bisect_right(self.keyframe_ticks, tick) - 1
+        if keyframe_position >= 0 and self.keyframe_ticks[keyframe_position] > engine.steps:
+            restore_keyframe(engine, self.keyframes[keyframe_position])
+
+        self.play(engine, end_tick=tick)
+        return engine
+
+    def play(self, engine: Engine = None, callback=None, end_tick: int = None) -> Brain:
+        """
+        Re-simulate the recorded game from the engine's current tick.
+
+        :param engine: Engine with the recorded game (if not provided, a new one is created from the game's start).
+        :param callback: Function to call with the game brain after every tick (e.g. to display the game).
+        :param end_tick: Tick to stop at. If set to None (default), the whole recording is played.
+        :return: Game brain in the state at the end tick.
+        """
+        engine = engine or self.new_engine()
+        brain = engine.brain
+        for code in self.ticks(engine.steps, end_tick):
+            engine.step(TURNS[brain.snake.direction][code])
+            if callback is not None:
+                callback(brain)
+        return brain
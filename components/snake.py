@@ -1,9 +1,18 @@
 from utils.coordinate_utils import validate_coordinates
+from utils.free_cell_index import FreeCellIndex
+from collections import deque
+from typing import NamedTuple
 import random
 
 from enums.direction import Direction
 
 
+class SnakeSnapshot(NamedTuple):
+    """Mutable state of the snake (see Snake.snapshot)."""
+    body_positions: tuple[tuple[int, int], ...]
+    direction: Direction
+
+
 class Snake:
     """
     Snake class to store snake's data and to interact with the snake.
@@ -15,7 +24,19 @@ class Snake:
     The snake should avoid colliding into its own tail or the game worlds borders as that ends the game.
     """
 
-    def __init__(self, left: int, top: int, step: int = 1, direction: Direction = None):
+    # Unit shift of the coordinates (x, y) for each of the directions
+    DIRECTION_MOVES = {
+        Direction.RIGHT: (1, 0),
+        Direction.LEFT: (-1, 0),
+        Direction.UP: (0, -1),
+        Direction.DOWN: (0, 1),
+    }
+
+    # Maximum amount of turns waiting in the direction queue
+    MAX_QUEUED_DIRECTIONS = 3
+
+    def __init__(self, left: int, top: int, step: int = 1, direction: Direction = None,
+                 free_cells: FreeCellIndex = None, rng: random.Random = None):
         """
         Snake constructor method.
 
@@ -24,17 +45,40 @@ class Snake:
         :param step: Defines how many in-game blocks the snake should move forward at once.
         :param direction: Snake's starting direction.
                           If a direction is not provided, the snake will start in a random direction.
+        :param free_cells: Index of the free game area positions, that is kept up to date as the snake moves.
+                           If not provided, the free positions are not tracked.
+        :param rng: Random number generator to select the random starting direction with.
+                    If not provided, the global random module is used.
         """
         validate_coordinates((left, top))
 
-        self.body_positions = [(left, top)]
+        self.body_positions = deque()  # Snake's positions (x, y) from the head to the tail
+        self.occupancy = {}  # Amount of snake's body positions on each of the occupied coordinates
+        self.overlaps = 0  # Amount of body positions, that share coordinates with another body position
+
+        self.free_cells = free_cells
+
+        # Serial number of the head position, every new head gets the next serial number,
+        # so the serial number of the body position at the index i is head_serial - i
+        self.head_serial = 0
+        self.body_observers = []  # Indices of the body positions, that are kept up to date (see attach_body_observer)
+
+        # Undo points, each of them is a list of the changes made since: the removed tail position of a move
+        # or None for growing, along with the direction at the time the undo point was added (see push_undo_point)
+        self.undo_log = []
+
+        self.body_positions.append((left, top))
+        self.occupy_position((left, top))
 
         self.step = step
 
         if direction is None:
-            direction = random.choice(list(Direction))
+            direction = (rng or random).choice(list(Direction))
         self.direction = direction
 
+        # Turns, that have been queued up (e.g. from quick key presses) and are applied one per move
+        self.direction_queue = deque()
+
     def length(self) -> int:
         """Length of the snake in in-game blocks."""
         return len(self.body_positions)
@@ -52,19 +96,54 @@ class Snake:
                                   new_direction != self.opposite_direction(self.direction)):
             self.direction = new_direction
 
+    def queue_direction(self, new_direction: Direction) -> None:
+        """
+        Queue up a turn, to be applied before one of the next moves (one turn per move, see apply_queued_direction).
+
+        The turn is validated the same way as by change_direction, but against the last queued direction
+        instead of the current direction, so quick turns (e.g. up and then left while moving right)
+        are all applied in order, instead of the latter overwriting the former.
+        Turns, that have no effect, and turns beyond the queue's capacity are ignored.
+
+        :param new_direction: New direction of the snake.
+        """
+        if len(self.direction_queue) >= self.MAX_QUEUED_DIRECTIONS:
+            return
+        last_direction = self.direction_queue[-1] if self.direction_queue else self.direction
+        if new_direction == last_direction:
+            return
+        if self.length() == 1 or new_direction != self.opposite_direction(last_direction):
+            self.direction_queue.append(new_direction)
+
+    def apply_queued_direction(self) -> None:
+        """Turn the snake to the next queued direction (if there is one)."""
+        if self.direction_queue:
+            self.change_direction(self.direction_queue.popleft())
+
     def move(self) -> None:
         """
         Get the snake's head's current coordinates.
         Shift the coordinates by the snake's speed (step).
-        Add the new head position to the beginning of the snake's body positions list and
+        Add the new head position to the beginning of the snake's body positions deque and
         remove the last element from snake's tail.
 
         If the snake has just grown then, the last element is duplicate of the one before that.
         By using the move method, the duplicate element will be eliminated, yet the snake's length has been increased.
+
+        The tail is removed before the head is added, so the snake can follow its own tail without a collision.
         """
-        head_x, head_y = self.get_head_position()
+        head_x, head_y = self.body_positions[0]
         new_head_position = self.shift_head_coordinates(head_x, head_y)
-        self.body_positions = [new_head_position] + self.body_positions[:-1]
+        tail_position = self.body_positions.pop()
+        self.vacate_position(tail_position)
+        self.body_positions.appendleft(new_head_position)
+        self.occupy_position(new_head_position)
+        self.head_serial += 1
+        for observer in self.body_observers:
+            observer.remove(tail_position, self.head_serial - len(self.body_positions))
+            observer.add(new_head_position, self.head_serial)
+        if self.undo_log:
+            self.undo_log[-1][1].append(tail_position)
 
     def grow(self) -> None:
         """
@@ -72,9 +151,131 @@ class Snake:
 
         The snake's new and old tail are on the same coordinates.
         After the grow() method, the move() method has to be called, since during the shifting in move(),
-        the last element of the snake's positions list is removed, therefore getting rid of the duplicate position.
+        the last element of the snake's positions deque is removed, therefore getting rid of the duplicate position.
+        """
+        tail_position = self.body_positions[-1]
+        self.body_positions.append(tail_position)
+        self.occupy_position(tail_position)
+        for observer in self.body_observers:
+            observer.add(tail_position, self.head_serial - len(self.body_positions) + 1)
+        if self.undo_log:
+            self.undo_log[-1][1].append(None)
+
+    def snapshot(self) -> SnakeSnapshot:
+        """
+        Capture the snake's mutable state (body positions and direction).
+
+        The snapshot's size is proportional to the snake's length, not to the size of the game board.
+        """
+        return SnakeSnapshot(tuple(self.body_positions), self.direction)
+
+    def restore(self, snapshot: SnakeSnapshot) -> None:
+        """
+        Restore the snake's state from the snapshot.
+
+        The current body positions are vacated and the snapshot's body positions are occupied,
+        which keeps the occupancy and the free positions up to date. Undo points and queued turns are discarded.
+
+        :param snapshot: Snapshot of a snake's state.
         """
-        self.body_positions.append(self.get_tail_position())
+        for position in self.body_positions:
+            self.vacate_position(position)
+        self.body_positions = deque(snapshot.body_positions)
+        for position in self.body_positions:
+            self.occupy_position(position)
+        self.direction = snapshot.direction
+        self.direction_queue.clear()
+        self.undo_log.clear()
+        for observer in self.body_observers:
+            self.attach_body_observer(observer)
+
+    def push_undo_point(self) -> None:
+        """
+        Start recording the changes of the snake, so they can be rolled back with undo().
+
+        Undo points can be nested, undo() rolls back the changes made since the latest undo point.
+        Each move and growth adds a single entry to the undo point, so rolling back a step takes constant time.
+        """
+        self.undo_log.append((self.direction, []))
+
+    def undo(self) -> None:
+        """
+        Roll back the changes made since the latest undo point and remove the undo point.
+
+        :raises IndexError: If there are no undo points.
+        """
+        direction, changes = self.undo_log.pop()
+        for tail_position in reversed(changes):
+            if tail_position is None:  # Undo growing
+                removed_tail_position = self.body_positions.pop()
+                self.vacate_position(removed_tail_position)
+                for observer in self.body_observers:
+                    observer.remove(removed_tail_position, self.head_serial - len(self.body_positions))
+            else:  # Undo moving
+                head_position = self.body_positions.popleft()
+                self.vacate_position(head_position)
+                self.body_positions.append(tail_position)
+                self.occupy_position(tail_position)
+                self.head_serial -= 1
+                for observer in self.body_observers:
+                    observer.remove(head_position, self.head_serial + 1)
+                    observer.add(tail_position, self.head_serial - len(self.body_positions) + 1)
+        self.direction = direction
+
+    def attach_body_observer(self, observer) -> None:
+        """
+        Index the snake's body positions in the observer and keep the observer up to date as the snake changes.
+
+        An observer is an index of the body positions (e.g. SpatialIndex), that provides the methods:
+            * clear() - remove all the positions,
+            * add(position, serial) - add a body position along with its serial number,
+            * remove(position, serial) - remove a body position along with its serial number.
+        The observer is cleared before the body positions are added.
+
+        :param observer: Index of the body positions.
+        """
+        observer.clear()
+        for index, position in enumerate(self.body_positions):
+            observer.add(position, self.head_serial - index)
+        if observer not in self.body_observers:
+            self.body_observers.append(observer)
+
+    def occupy_position(self, position: tuple[int, int]) -> None:
+        """
+        Register a body position on the given coordinates.
+
+        If the coordinates were already occupied, the body positions overlap,
+        otherwise the coordinates are no longer free.
+
+        :param position: Coordinates (x, y) of the new body position.
+        """
+        count = self.occupancy.get(position, 0)
+        if count:
+            self.overlaps += 1
+        elif self.free_cells is not None:
+            self.free_cells.discard(position)
+        self.occupancy[position] = count + 1
+
+    def vacate_position(self, position: tuple[int, int]) -> None:
+        """
+        Unregister a body position from the given coordinates.
+
+        If no other body position remains on the coordinates, they become free again.
+
+        :param position: Coordinates (x, y) of the removed body position.
+        """
+        count = self.occupancy[position]
+        if count > 1:
+            self.overlaps -= 1
+            self.occupancy[position] = count - 1
+        else:
+            del self.occupancy[position]
+            if self.free_cells is not None:
+                self.free_cells.add(position)
+
+    def is_occupied(self, position: tuple[int, int]) -> bool:
+        """Check if any of the snake's body positions is on the given coordinates (x, y)."""
+        return position in self.occupancy
 
     def shift_head_coordinates(self, head_x: int, head_y: int) -> tuple[int, int]:
         """
@@ -84,18 +285,12 @@ class Snake:
         :param head_y: Snake head's current y-coordinate.
         :return: Snake head's new coordinates.
         """
-        direction_moves = {
-            Direction.RIGHT: (self.step, 0),
-            Direction.LEFT: (-self.step, 0),
-            Direction.UP: (0, -self.step),
-            Direction.DOWN: (0, self.step),
-        }
-        move_x, move_y = direction_moves.get(self.direction, (0, 0))
-        return head_x + move_x, head_y + move_y
+        move_x, move_y = self.DIRECTION_MOVES.get(self.direction, (0, 0))
+        return head_x + move_x * self.step, head_y + move_y * self.step
 
     def self_collision_detection(self) -> bool:
-        """Detect if the snake has collided into itself."""
-        return len(self.body_positions) != len(set(self.body_positions))
+        """Detect if the snake has collided into itself (any of its body positions overlap)."""
+        return self.overlaps > 0
 
     def get_body_position(self, position_index: int) -> tuple[int, int]:
         """
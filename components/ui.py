@@ -5,6 +5,8 @@ from enums.color_mode import ColorMode
 from enums.game_status import GameStatus
 from enums.score_type import ScoreType
 from utils.color_scheme import ColorScheme
+from utils.spatial_index import SpatialIndex
+from utils.text_cache import TextCache
 
 
 class Ui:
@@ -13,14 +15,20 @@ class Ui:
 
     To display the game, convert the game brain's in-game block measurements to pixels,
     using the block_size to scale blocks to the wished scale.
+
+    If the game board is larger than the viewport, only the part of the board inside the viewport is displayed.
+    The viewport scrolls along with the snake's head and only the snake's positions inside the viewport are drawn,
+    which are found with a spatial index instead of going through the whole body.
     """
 
-    def __init__(self, brain: Brain, block_size: int = 10):
+    def __init__(self, brain: Brain, block_size: int = 10, viewport: tuple[int, int] = None):
         """
         Game UI constructor method.
 
         :param brain: Game brain, which provides the game state, for which the UI is displayed.
         :param block_size: The amount of pixels that should be displayed per one in-game block.
+        :param viewport: Width and height of the displayed part of the game board measured in in-game blocks.
+                         If set to None (default), the whole game board is displayed.
         """
         self.brain = brain
 
@@ -28,14 +36,27 @@ class Ui:
 
         self.color_scheme = ColorScheme.get_default_color_scheme()
 
-        self.display_width = self.blocks_to_pixels(brain.display_width)  # Actual width of the game board
-        self.display_height = self.blocks_to_pixels(brain.display_height)  # Actual height of the game board
+        # Visible part of the game board (the viewport) measured in in-game blocks
+        self.view_width, self.view_height = (brain.display_width, brain.display_height) if viewport is None else \
+            (min(viewport[0], brain.display_width), min(viewport[1], brain.display_height))
+        self.camera_left, self.camera_top = 0, 0  # Coordinates of the viewport's top left corner on the game board
+        self.spatial_index = SpatialIndex()  # Spatial index of the snake's body positions (used if the view is culled)
+
+        self.display_width = self.blocks_to_pixels(self.view_width)  # Actual width of the displayed game board
+        self.display_height = self.blocks_to_pixels(self.view_height)  # Actual height of the displayed game board
 
         self.display = pygame.display.set_mode([self.display_width, self.display_height])
 
         self.score_font = pygame.font.SysFont("monospace", 20, True)
         self.instructions_font = pygame.font.SysFont("monospace", 18)
         self.game_font = pygame.font.SysFont("monospace", 25, True)
+        self.profiler_font = pygame.font.SysFont("monospace", 14)
+        self.text_cache = TextCache()  # Rendered text surfaces, that are reused while the text does not change
+
+        self.rendered_frame = None  # State of the game at the last drawn frame (see draw_game_dirty)
+
+        self.background = None  # Pre-rendered game area with borders (see draw_game_area)
+        self.background_key = None  # Board measurements and colors, that the background was rendered with
 
     def draw_game(self) -> None:
         """
@@ -51,11 +72,12 @@ class Ui:
         If the game is paused,
             display the game status (paused/lost/won) and instructions.
         """
+        self.update_camera()
         self.draw_game_area()
+        self.draw_game_elements()
         self.display_score(ScoreType.CURRENT, self.blocks_to_pixels(self.brain.left_border))
         self.display_score(ScoreType.HIGH, round(self.display_width * 0.8), 0, "Highscore: ")
         self.display_scheme_name()
-        self.draw_game_elements()
         if self.brain.game_paused:
             self.draw_pause_elements()
 
@@ -73,39 +95,63 @@ class Ui:
         """
         Draw the base of the game board surrounded by the game's borders.
 
+        If the whole game board is displayed, the game area is rendered once into a cached background surface,
+        which is then displayed with a single blit. The background is rendered again only if the board measurements,
+        the block size or the colors change.
+        If only a part of the game board is visible, the background is filled and the borders are drawn
+        offset by the camera straight onto the display (pygame clips them to the viewport),
+        so scrolling the viewport does not render a new background.
+
         :param base_color: Color of the game board background.
         :param border_color: Color of the borders.
         """
-        self.display.fill(base_color)
+        if self.is_view_culled():
+            self.render_game_area(self.display, base_color, border_color)
+            return
+
+        brain = self.brain
+        background_key = (brain.display_width, brain.display_height, brain.top_border, brain.bottom_border,
+                          brain.left_border, brain.right_border, self.block_size, base_color, border_color)
+        if self.background is None or self.background_key != background_key:
+            self.background = pygame.Surface(self.display.get_size()).convert(self.display)
+            self.render_game_area(self.background, base_color, border_color)
+            self.background_key = background_key
+        self.display.blit(self.background, (0, 0))
+
+    def render_game_area(self, surface: pygame.Surface, base_color, border_color) -> None:
+        """
+        Render the base of the game board surrounded by the game's borders onto the surface.
+
+        :param surface: Surface of the viewport's size to render onto.
+        :param base_color: Color of the game board background.
+        :param border_color: Color of the borders.
+        """
+        surface.fill(base_color)
         for border in self.brain.get_borders():
-            self.draw_rectangle(border, border_color)
+            pygame.draw.rect(surface, border_color, self.view_rectangle(border))
 
     def draw_snake(self) -> None:
-        """Draw the snake block by block with the appropriate colors."""
-        # Draw the head
-        if self.color_scheme.head_color is not None:
-            self.draw_block_in_position(self.brain.snake.get_head_position(), self.color_scheme.head_color)
-
-        snake_pattern_start = 0 if self.color_scheme.head_color is None else 1
-        snake_pattern_end = self.brain.snake.length() \
-            if self.color_scheme.tail_color is None \
-            else self.brain.snake.length() - 1
-
-        # Draw the pattern on the body
-        if self.color_scheme.color_mode == ColorMode.PATTERN_ONCE:
-            self.draw_pattern_once_snake(snake_pattern_start, snake_pattern_end)
-        else:
-            self.draw_default_snake(snake_pattern_start, snake_pattern_end)
+        """Draw the snake (only the part inside the viewport) block by block with the appropriate colors."""
+        snake = self.brain.snake
+        snake_colors = self.color_scheme.get_snake_colors(snake.length())
+        if not self.is_view_culled():
+            for position, color in zip(snake.body_positions, snake_colors):
+                self.draw_block_in_position(position, color)
+            return
 
-        # Draw the tail
-        if self.color_scheme.tail_color is not None:
-            self.draw_block_in_position(self.brain.snake.get_tail_position(), self.color_scheme.tail_color)
+        for index, position in self.get_visible_segments():
+            self.draw_block_in_position(position, snake_colors[index])
 
     def draw_food(self) -> None:
-        """Draw the food block using the food color of the color scheme."""
-        food_color = self.color_scheme.food_color if self.brain.food.lifetime is None \
+        """Draw the food block using the food color of the color scheme (if there is food on the board)."""
+        if self.brain.food is None:
+            return
+        self.draw_block_in_position(self.brain.food.get_position(), self.get_food_color())
+
+    def get_food_color(self) -> tuple[int, int, int]:
+        """Get the color of the current food (superfoods darken as their lifetime runs out)."""
+        return self.color_scheme.food_color if self.brain.food.lifetime is None \
             else self.get_special_food_color(self.brain.food.lifetime)
-        self.draw_block_in_position(self.brain.food.get_position(), food_color)
 
     def display_score(self, score_type: ScoreType = ScoreType.CURRENT,
                       x: int = 0, y: int = 0,
@@ -159,6 +205,203 @@ class Ui:
             self.display_text(line, self.instructions_font, text_color, self.display_width / 2.75, line_height)
             line_height += 30
 
+    def draw_profiler_overlay(self, profiler, target_fps: int = None, text_color=colors.WHITE,
+                              background_color=colors.BLACK) -> pygame.Rect:
+        """
+        Display the profiler's measurements on top of the game screen (below the score).
+
+        The overlay shows the achieved frames per second (along with the target) and the average, 50th, 95th and
+        99th percentile of the time spent per frame in each of the measured metrics (in milliseconds).
+
+        :param profiler: Profiler, whose measurements to display.
+        :param target_fps: Frames per second, that the game aims for.
+        :param text_color: Color to display the text in.
+        :param background_color: Color of the overlay's background.
+        :return: Rectangle of the screen, that the overlay was drawn on.
+        """
+        fps_line = f"FPS {profiler.fps():6.1f}" + ("" if target_fps is None else f" / {target_fps}")
+        lines = [fps_line, f"{'ms per frame':<24}{'mean':>7}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for metric_name, timings in sorted(profiler.summary().items()):
+            lines.append(f"{metric_name:<24}{timings['mean']:7.2f}{timings['p50']:7.2f}"
+                         f"{timings['p95']:7.2f}{timings['p99']:7.2f}")
+
+        # The overlay's text changes every frame, so it is rendered directly instead of through the text cache
+        rendered_lines = [self.profiler_font.render(line, True, text_color) for line in lines]
+        line_height = self.profiler_font.get_linesize()
+        overlay = pygame.Rect(self.blocks_to_pixels(self.brain.left_border), self.score_font.get_linesize(),
+                              max(line.get_width() for line in rendered_lines), line_height * len(lines))
+        overlay = overlay.clip(self.display.get_rect())
+        self.display.fill(background_color, overlay)
+        for index, line in enumerate(rendered_lines):
+            self.display.blit(line, (overlay.left, overlay.top + index * line_height))
+        return overlay
+
+    # ------------------------------------ DIRTY RECTANGLES -------------------------------------
+
+    def request_full_redraw(self) -> None:
+        """Redraw the whole screen on the next draw_game_dirty call (e.g. after an overlay has been hidden)."""
+        self.rendered_frame = None
+
+    def draw_game_dirty(self) -> list[pygame.Rect]:
+        """
+        Display the game screen, redrawing only the parts that changed since the last drawn frame.
+
+        Between two steps only the snake's head and tail, the food and the score change,
+        so only their blocks (and the score line, if the score changed) are redrawn,
+        which keeps the cost of a frame independent of the snake's length.
+
+        The whole screen is redrawn, if:
+            * it is the first frame,
+            * the color scheme, the pause or the game status has changed or a new game has started,
+            * the viewport has scrolled,
+            * the snake's body colors depend on the position in the body (patterns move along with the snake),
+            * the snake has moved more than once since the last frame.
+
+        :return: Rectangles of the screen, that were redrawn (to pass on to pygame.display.update).
+        """
+        snake = self.brain.snake
+        self.update_camera()
+        frame_key = (id(self.color_scheme), self.color_scheme.color_mode,
+                     self.brain.game_paused, self.brain.game_status, id(snake), self.camera_left, self.camera_top)
+        previous_frame = self.rendered_frame
+        current_frame = {
+            "key": frame_key,
+            "head": snake.get_head_position(),
+            "tail": snake.get_tail_position(),
+            "food": None if self.brain.food is None else self.brain.food.get_position(),
+            "scores": (self.brain.current_score, self.brain.high_score),
+        }
+        self.rendered_frame = current_frame
+
+        snake_moved_once = (snake.length() == 1 or previous_frame is not None and
+                            previous_frame["head"] in (snake.get_head_position(), snake.get_body_position(1)))
+        if (previous_frame is None or previous_frame["key"] != frame_key or not snake_moved_once or
+                len(set(self.color_scheme.body_pattern)) > 1):
+            self.draw_game()
+            return [self.display.get_rect()]
+
+        screen = self.display.get_rect()
+        dirty_positions = {previous_frame["head"], previous_frame["tail"], previous_frame["food"],
+                           current_frame["head"], current_frame["tail"], current_frame["food"]} - {None}
+        dirty_regions = [screen.clip(self.view_rectangle([x, y, 1, 1])) for x, y in dirty_positions]
+        if previous_frame["scores"] != current_frame["scores"]:
+            dirty_regions.append(screen.clip(0, 0, self.display_width, max(self.blocks_to_pixels(self.brain.top_border),
+                                                                           self.score_font.get_linesize())))
+
+        dirty_regions = [region for region in dirty_regions if region.width and region.height]
+        for region in dirty_regions:
+            self.redraw_region(region)
+        return dirty_regions
+
+    def redraw_region(self, region: pygame.Rect) -> None:
+        """
+        Redraw the game screen inside the region (in pixels).
+
+        Drawing is clipped to the region: the background and the texts are drawn as usual,
+        the blocks inside the region are drawn based on what occupies them.
+
+        :param region: Region of the screen to redraw.
+        """
+        self.display.set_clip(region)
+        self.draw_game_area()
+        self.draw_region_blocks(region)
+        self.display_score(ScoreType.CURRENT, self.blocks_to_pixels(self.brain.left_border))
+        self.display_score(ScoreType.HIGH, round(self.display_width * 0.8), 0, "Highscore: ")
+        self.display_scheme_name()
+        if self.brain.game_paused:
+            self.draw_pause_elements()
+        self.display.set_clip(None)
+
+    def draw_region_blocks(self, region: pygame.Rect) -> None:
+        """
+        Draw the snake's and the food's blocks inside the region (in pixels), based on what occupies them.
+
+        :param region: Region of the screen to draw the blocks in.
+        """
+        for x in range(self.camera_left + region.left // self.block_size,
+                       self.camera_left + (region.right - 1) // self.block_size + 1):
+            for y in range(self.camera_top + region.top // self.block_size,
+                           self.camera_top + (region.bottom - 1) // self.block_size + 1):
+                block_color = self.get_block_color((x, y))
+                if block_color is not None:
+                    self.draw_block_in_position((x, y), block_color)
+
+    def get_block_color(self, position: tuple[int, int]):
+        """
+        Get the color of the snake or the food at the position, as drawn by draw_game_elements.
+
+        Only supports color schemes, where the snake's body color does not depend on the position in the body.
+
+        :param position: Position (x, y) of the block.
+        :return: Color of the block or None, if the position is not occupied by the snake or the food.
+        """
+        snake = self.brain.snake
+        if snake.is_occupied(position):
+            if self.color_scheme.tail_color is not None and position == snake.get_tail_position():
+                return self.color_scheme.tail_color
+            # The body is drawn over the head, if another body position shares the head's coordinates
+            if (self.color_scheme.head_color is not None and position == snake.get_head_position() and
+                    snake.occupancy[position] == 1):
+                return self.color_scheme.head_color
+            return self.color_scheme.body_pattern[0]
+        if self.brain.food is not None and position == self.brain.food.get_position():
+            return self.get_food_color()
+        return None
+
+    # ----------------------------------------- VIEWPORT ----------------------------------------
+
+    def is_view_culled(self) -> bool:
+        """Check if only a part of the game board is visible in the viewport."""
+        return self.view_width < self.brain.display_width or self.view_height < self.brain.display_height
+
+    def update_camera(self) -> None:
+        """
+        Scroll the viewport to follow the snake's head.
+
+        The viewport scrolls only when the head gets closer than a quarter of the viewport to its edge,
+        so while the head moves around the middle of the viewport, the displayed part of the board stays the same.
+        The viewport never scrolls past the edges of the game board.
+        """
+        if not self.is_view_culled():
+            return
+        head_x, head_y = self.brain.snake.get_head_position()
+        self.camera_left = self.follow_coordinate(self.camera_left, head_x, self.view_width, self.brain.display_width)
+        self.camera_top = self.follow_coordinate(self.camera_top, head_y, self.view_height, self.brain.display_height)
+
+    @staticmethod
+    def follow_coordinate(camera: int, head: int, view_size: int, board_size: int) -> int:
+        """
+        Get the viewport's coordinate, that keeps the head's coordinate away from the viewport's edges.
+
+        :param camera: Current coordinate of the viewport's edge.
+        :param head: Coordinate of the snake's head.
+        :param view_size: Size of the viewport along the coordinate axis.
+        :param board_size: Size of the game board along the coordinate axis.
+        :return: New coordinate of the viewport's edge.
+        """
+        margin = view_size // 4
+        if head < camera + margin:
+            camera = head - margin
+        elif head >= camera + view_size - margin:
+            camera = head - view_size + margin + 1
+        return max(0, min(camera, board_size - view_size))
+
+    def get_visible_segments(self) -> list[tuple[int, tuple[int, int]]]:
+        """
+        Find the snake's body positions inside the viewport with the spatial index.
+
+        :return: List of the indices and coordinates (index, (x, y)) of the visible body positions,
+                 sorted from the head to the tail (in the order they are drawn).
+        """
+        snake = self.brain.snake
+        if self.spatial_index not in snake.body_observers:  # A new game has started
+            snake.attach_body_observer(self.spatial_index)
+        head_serial = snake.head_serial
+        segments = [(head_serial - serial, position) for serial, position in
+                    self.spatial_index.query(self.camera_left, self.camera_top, self.view_width, self.view_height)]
+        segments.sort()
+        return segments
+
     # ----------------------------------- COLOR SCHEME METHODS ----------------------------------
 
     def set_color_scheme(self, color_scheme: ColorScheme) -> None:
@@ -210,47 +453,6 @@ class Ui:
 
     # ----------------------------------------- HELPERS -----------------------------------------
 
-    def draw_pattern_once_snake(self, snake_pattern_start: int, snake_pattern_end: int) -> None:
-        """
-        Draw the snake's patterned body in the PATTERN_ONCE.
-
-        The UI color scheme's body pattern is displayed once across the snake's body.
-        The length of each pattern color depends on the length of the snake.
-        The segments get longer starting from the head.
-
-        :param snake_pattern_start: Index of the snake position, where to start drawing the pattern from.
-        :param snake_pattern_end: Index of the snake position, where to stop drawing the pattern.
-        """
-        pattern_index = 0
-        pattern = self.color_scheme.body_pattern
-        pattern_length = len(pattern)
-
-        base_segment_length = self.brain.snake.length() // pattern_length
-        extra_segments = self.brain.snake.length() % pattern_length
-
-        segment_counter = base_segment_length if extra_segments <= 0 else base_segment_length + 1
-        for pos in self.brain.snake.body_positions[snake_pattern_start:snake_pattern_end]:
-            self.draw_block_in_position(pos, pattern[pattern_index])
-            segment_counter -= 1
-            if segment_counter <= 0:
-                pattern_index += 1
-                extra_segments -= 1  # Remove an extra segment, before re-calculating, in case it was just used up.
-                segment_counter = base_segment_length if extra_segments <= 0 else base_segment_length + 1
-
-    def draw_default_snake(self, snake_pattern_start: int, snake_pattern_end: int) -> None:
-        """
-        Draw the snake's patterned body in the PATTERN_REPEAT and SOLID color mode.
-
-        The UI color scheme's body pattern is repeatedly iterated over until the end of the snake.
-
-        :param snake_pattern_start: Index of the snake position, where to start drawing the pattern from.
-        :param snake_pattern_end: Index of the snake position, where to stop drawing the pattern.
-        """
-        pattern_index = 0
-        for pos in self.brain.snake.body_positions[snake_pattern_start:snake_pattern_end]:
-            self.draw_block_in_position(pos, self.color_scheme.body_pattern[pattern_index])
-            pattern_index = (pattern_index + 1) % len(self.color_scheme.body_pattern)
-
     def draw_block_in_position(self, position: tuple[int, int], color: tuple[int, int, int]) -> None:
         """
         Display a 1x1 square block at the given position.
@@ -269,20 +471,21 @@ class Ui:
         :param block_rectangle: Rectangle information [width, height, x, y] measured in in-game blocks.
         :param color: Color to display the rectangle.
         """
-        pygame.draw.rect(self.display, color, self.pixel_rectangle(block_rectangle))
+        pygame.draw.rect(self.display, color, self.view_rectangle(block_rectangle))
 
     def display_text(self, text: str, font, color, x, y) -> None:
         """
         Display the text on the screen, in the given font and color, at the set coordinates.
 
+        The text is rendered only if it was not rendered recently (see TextCache).
+
         :param text: Text to display on the screen.
         :param font: Font to display the text.
         :param color: Color to display the text in.
         :param x: X-coordinate to display the text at.
         :param y: Y-coordinate to display the text at.
         """
-        text = font.render(text, True, color)
-        self.display.blit(text, [x, y])
+        self.display.blit(self.text_cache.render(text, font, color), [x, y])
 
     def blocks_to_pixels(self, blocks: int) -> int:
         """
@@ -305,6 +508,19 @@ class Ui:
         """
         return [self.blocks_to_pixels(value) for value in block_rectangle]
 
+    def view_rectangle(self, block_rectangle: list[int, int, int, int]) -> list[int, int, int, int]:
+        """
+        Convert the rectangle in-game block measurements list to pixel information on the screen.
+
+        The rectangle is positioned relative to the viewport's top left corner.
+
+        :param block_rectangle: Rectangle information [left_x_coordinate, top_y_coordinate, width, height]
+                                measured in in-game blocks.
+        :return: Rectangle information [left_x_coordinate, top_y_coordinate, width, height] measured in pixels.
+        """
+        left, top, width, height = block_rectangle
+        return self.pixel_rectangle([left - self.camera_left, top - self.camera_top, width, height])
+
     @staticmethod
     def get_special_food_color(lifetime: int) -> tuple[int, int, int]:
         """
@@ -0,0 +1,7 @@
+from enum import Enum, auto
+
+
+class ObservationMode(Enum):
+    """Format of the observations, that the game environment provides for agents."""
+    PLANES = auto()  # Grid planes (channels) of the game board
+    VECTOR = auto()  # Compact vector of features around the snake's head
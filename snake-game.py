@@ -1,10 +1,15 @@
+import argparse
 import pygame
 from enums.direction import Direction
 from components.brain import Brain
 from components.ui import Ui
+from utils.profiler import Profiler
+from utils.scheduler import Scheduler
 
+FRAME_RATE = 60  # Maximum amount of displayed frames per second
 
-def game_loop():
+
+def game_loop(metrics_path: str = None):
 
     # PyGame initialization
     pygame.init()
@@ -15,6 +20,31 @@ def game_loop():
     game_brain = Brain(80, 60, [])
     ui = Ui(game_brain)
 
+    # Game ticks are simulated on a fixed timestep, independent of how often the frames are displayed
+    scheduler = Scheduler(game_brain.snake.step * 10)
+
+    # Profiler measures the timings of the game, it is installed only while it is turned on (F3 or --metrics)
+    metrics_file = open(metrics_path, "w") if metrics_path else None
+    profiler = Profiler(export_file=metrics_file)
+    for target, method_name, metric_name in [
+        (game_brain, "snake_move", "sim.snake_move"),
+        (game_brain, "snake_move_effects", "sim.snake_move_effects"),
+        (ui, "draw_game_dirty", "render.total"),
+        (ui, "draw_game_area", "render.area"),
+        (ui, "draw_snake", "render.snake"),
+        (ui, "draw_food", "render.food"),
+        (ui, "draw_region_blocks", "render.dirty"),
+        (ui, "display_text", "render.text"),
+        (pygame.display, "update", "display.update"),
+    ]:
+        profiler.add_method(target, method_name, metric_name)
+    if metrics_file is not None:
+        profiler.enable()
+
+    def toggle_profiler():
+        profiler.toggle()
+        ui.request_full_redraw()  # Clear the overlay from the screen
+
     color_scheme_controls = {
         pygame.K_s: ui.set_slytherin_color_scheme,
         pygame.K_p: ui.set_python_color_scheme,
@@ -27,6 +57,11 @@ def game_loop():
         pygame.K_CAPSLOCK: ui.toggle_color_scheme_repeat,
     }
 
+    game_speed_controls = {
+        pygame.K_TAB: scheduler.toggle_turbo,
+        pygame.K_F3: toggle_profiler,
+    }
+
     game_paused_controls = {
         pygame.K_ESCAPE: game_brain.quit_game,
         pygame.K_SPACE: game_brain.unpause_game,
@@ -35,17 +70,14 @@ def game_loop():
 
     game_play_controls = {
         pygame.K_ESCAPE: game_brain.pause_game,
-        pygame.K_LEFT: lambda: game_brain.snake.change_direction(Direction.LEFT),
-        pygame.K_RIGHT: lambda: game_brain.snake.change_direction(Direction.RIGHT),
-        pygame.K_UP: lambda: game_brain.snake.change_direction(Direction.UP),
-        pygame.K_DOWN: lambda: game_brain.snake.change_direction(Direction.DOWN),
+        pygame.K_LEFT: lambda: game_brain.snake.queue_direction(Direction.LEFT),
+        pygame.K_RIGHT: lambda: game_brain.snake.queue_direction(Direction.RIGHT),
+        pygame.K_UP: lambda: game_brain.snake.queue_direction(Direction.UP),
+        pygame.K_DOWN: lambda: game_brain.snake.queue_direction(Direction.DOWN),
     }
 
     # Game Loop
     while not game_brain.game_quit:
-        ui.draw_game()
-        pygame.display.update()
-
         # Game Controls
         for event in pygame.event.get():
             if event.type == pygame.KEYDOWN:
@@ -53,6 +85,8 @@ def game_loop():
                 # Common Game Controls - Available all the time
                 if event.key in color_scheme_controls:
                     color_scheme_controls[event.key]()
+                if event.key in game_speed_controls:
+                    game_speed_controls[event.key]()
 
                 # Paused Game Controls
                 if game_brain.game_paused:
@@ -64,24 +98,34 @@ def game_loop():
                     if event.key in game_play_controls:
                         game_play_controls[event.key]()
 
-                break
-
-        if game_brain.game_quit or game_brain.game_paused:
-            continue
+        if game_brain.game_quit:
+            break
 
         # Game Logic
-
-        game_brain.snake_move()
-
-        ui.draw_game()
-        pygame.display.update()
-
-        game_brain.snake_move_effects()
-
-        clock.tick(game_brain.snake.step * 10)
-
+        if game_brain.game_paused:
+            scheduler.reset()
+        else:
+            for _ in range(scheduler.frame_ticks()):
+                game_brain.snake_move()
+                game_brain.snake_move_effects()
+                if game_brain.game_paused:  # The game has ended
+                    break
+
+        dirty_regions = ui.draw_game_dirty()
+        if profiler.enabled:
+            dirty_regions.append(ui.draw_profiler_overlay(profiler, FRAME_RATE))
+        pygame.display.update(dirty_regions)
+        profiler.end_frame()
+
+        clock.tick(FRAME_RATE)
+
+    if metrics_file is not None:
+        metrics_file.close()
     pygame.quit()
     quit()
 
 
-game_loop()
+parser = argparse.ArgumentParser(description="Snake (Python) Game")
+parser.add_argument("--metrics", dest="metrics_path",
+                    help="Turn the profiler on and write the timings of every frame to the given file (JSON lines).")
+game_loop(parser.parse_args().metrics_path)
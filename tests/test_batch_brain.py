@@ -0,0 +1,117 @@
+"""
+Parity tests of the batch brain against the game brain.
+
+Every board of a batch brain is mirrored by a game brain, that is stepped with the same actions.
+The food is generated by the batch brain's random number generator, so the mirrored brains take their food
+from the batch brain instead of generating their own (see mirror_brains). After every step the game status,
+the scores, the snake's body and the food of every board have to be identical.
+
+Run from the repository root: python -m pytest
+"""
+import random
+
+import numpy as np
+import pytest
+
+from agents.hamiltonian import hamiltonian_policy
+from components.batch_brain import BatchBrain, DIRECTIONS, KEEP_DIRECTION
+from components.brain import Brain
+from components.engine import Engine
+from components.food import Food
+from enums.game_status import GameStatus
+
+BOARD_COUNT = 32
+
+
+def mirror_brains(batch: BatchBrain, border_widths: list[int], seed: int) -> list[Engine]:
+    """Create a game brain (driven by an engine) for every board of the batch brain with the same starting state."""
+    engines = []
+    for board in range(batch.board_count):
+        brain = Brain(batch.game_area_width, batch.game_area_height, border_widths, seed=seed + board)
+
+        def generate_food(brain=brain, board=board):
+            lifetime = int(batch.food_lifetime[board])
+            brain.food = Food(*batch.get_food_position(board), int(batch.food_score[board]),
+                              None if lifetime < 0 else lifetime)
+            return brain.food
+
+        brain.generate_food = generate_food
+        brain.food = generate_food()
+        brain.snake.direction = DIRECTIONS[batch.direction[board]]
+        engines.append(Engine(brain))
+    return engines
+
+
+def assert_same_state(batch: BatchBrain, engines: list[Engine]) -> None:
+    """Assert, that every board of the batch brain is in the same state as its mirrored game brain."""
+    for board, engine in enumerate(engines):
+        brain = engine.brain
+        assert brain.game_status.value == batch.game_status[board], board
+        assert brain.current_score == batch.current_score[board], board
+        if brain.game_status is not GameStatus.ONGOING:
+            continue  # The position of the colliding head is not stored the same way
+        # The game brain stores the duplicate tail position after growing, the batch brain counts it in the length
+        assert list(dict.fromkeys(brain.snake.body_positions)) == batch.get_body_positions(board), board
+        assert brain.snake.length() == batch.length[board], board
+        assert brain.snake.direction is DIRECTIONS[batch.direction[board]], board
+        if brain.food is None:
+            assert batch.get_food_position(board) is None, board
+        else:
+            assert brain.food.get_position() == batch.get_food_position(board), board
+            assert brain.food.score == batch.food_score[board], board
+            assert (brain.food.lifetime is None) == (batch.food_lifetime[board] < 0), board
+
+
+def step_both(batch: BatchBrain, engines: list[Engine], actions: np.ndarray) -> None:
+    """Step the batch brain and the mirrored game brains with the same actions and compare them."""
+    batch.step(actions)
+    for engine, action in zip(engines, actions):
+        engine.step(None if action == KEEP_DIRECTION else DIRECTIONS[action])
+    assert_same_state(batch, engines)
+
+
+@pytest.mark.parametrize("width, height, border_widths", [
+    (2, 2, [0, 0, 0, 0]),
+    (3, 2, [1, 2, 3]),
+    (5, 4, []),
+    (7, 3, [0, 1, 0, 2]),
+    (10, 8, [2, 0, 0, 1]),
+])
+def test_random_actions(width, height, border_widths):
+    """Random actions (including keeping the direction and turning back) collide with the borders and the body."""
+    seed = width * 100 + height
+    batch = BatchBrain(BOARD_COUNT, width, height, border_widths, seed=seed)
+    engines = mirror_brains(batch, border_widths, seed)
+    assert_same_state(batch, engines)
+
+    actions_rng = random.Random(seed)
+    for _ in range(300):
+        actions = np.array([actions_rng.randrange(KEEP_DIRECTION, len(DIRECTIONS)) for _ in range(BOARD_COUNT)])
+        step_both(batch, engines, actions)
+
+    assert (batch.game_status == GameStatus.LOST.value).any()
+
+
+@pytest.mark.parametrize("width, height, border_widths", [
+    (2, 2, [0, 0, 0, 0]),
+    (4, 3, [1, 2, 3]),
+    (3, 4, []),
+])
+def test_filling_the_game_area(width, height, border_widths):
+    """Snakes, that fill the whole game area, get no new food and win the game by colliding."""
+    seed = width * 100 + height
+    batch = BatchBrain(BOARD_COUNT, width, height, border_widths, seed=seed)
+    engines = mirror_brains(batch, border_widths, seed)
+
+    for _ in range(width * height * width * height * 2):
+        if all(engine.brain.game_status is not GameStatus.ONGOING for engine in engines):
+            break
+        actions = np.array([KEEP_DIRECTION if engine.brain.game_status is not GameStatus.ONGOING else
+                            DIRECTIONS.index(hamiltonian_policy(engine.brain)) for engine in engines])
+        step_both(batch, engines, actions)
+        for engine in engines:
+            brain = engine.brain
+            if brain.game_status is GameStatus.ONGOING and brain.snake_at_max_capacity():
+                assert brain.food is None
+
+    assert (batch.game_status == GameStatus.WON.value).all()
@@ -0,0 +1,48 @@
+"""
+Tests of the reinforcement learning environment.
+
+Run from the repository root: python -m pytest
+"""
+import random
+
+import numpy as np
+import pytest
+
+from components.environment import SnakeEnv, ACTIONS, HEAD_PLANE, BODY_PLANE, FOOD_PLANE, WALL_PLANE
+
+
+@pytest.mark.parametrize("border_widths", [[0, 0, 0, 0], [1, 2, 0, 3]])
+def test_plane_observations_match_feature_planes(border_widths):
+    """The incrementally updated observation equals the brain's feature planes after every step."""
+    env = SnakeEnv(8, 6, border_widths, seed=1)
+    planes = env.brain.feature_planes
+    actions_rng = random.Random(2)
+    observation, _ = env.reset(seed=3)
+    games = 0
+    for _ in range(5000):
+        observation, _, terminated, truncated, _ = env.step(actions_rng.randrange(len(ACTIONS)))
+        assert (observation[HEAD_PLANE] == planes.head).all()
+        assert (observation[BODY_PLANE] == (planes.occupancy > 0)).all()
+        assert (observation[FOOD_PLANE] == planes.food).all()
+        assert (observation[WALL_PLANE] == planes.walls).all()
+        if terminated or truncated:
+            observation, _ = env.reset()
+            games += 1
+    assert games > 0
+
+
+def test_steps_after_the_game_has_ended():
+    """Stepping a finished game (without a reset) does not change it and gives no further rewards."""
+    env = SnakeEnv(4, 4, [0, 0, 0, 0], death_reward=-10.0, seed=1)
+    env.reset(seed=1)
+    action = ACTIONS.index(env.brain.snake.direction)
+    terminated, reward = False, 0.0
+    while not terminated:  # Keep going straight into the border
+        _, reward, terminated, _, info = env.step(action)
+    assert reward <= -10.0
+    steps = info["steps"]
+
+    for _ in range(3):
+        observation, reward, terminated, truncated, info = env.step(action)
+        assert (reward, terminated, truncated) == (0.0, True, False)
+        assert info["steps"] == steps
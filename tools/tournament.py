@@ -0,0 +1,193 @@
+"""
+Tournament runner to rank snake policies by playing many seeded games across a process pool.
+
+Every combination of policy, board size and seed is played as a separate headless game.
+The games are spread across worker processes and the results are streamed back as they finish,
+then aggregated into a report with the average score, length, steps survived and win rate per policy and board size.
+
+Usage (from the repository root):
+
+    python -m tools.tournament agents.basic_policies:greedy_policy agents.basic_policies:random_policy
+                               --seeds 1000 --boards 20x20 80x60 --processes 8
+"""
+import argparse
+import importlib
+import json
+import random
+import time
+from multiprocessing import Pool
+from typing import Iterator, NamedTuple
+
+from components.brain import Brain
+from components.engine import Engine
+from enums.game_status import GameStatus
+
+
+class GameTask(NamedTuple):
+    """A single tournament game to be played by a worker process."""
+    policy: str  # Import path of the policy in the format "module:function"
+    seed: int
+    board: tuple[int, int]  # Game area width and height in in-game blocks
+    max_steps: int
+
+
+class GameResult(NamedTuple):
+    """Outcome of a single tournament game."""
+    policy: str
+    seed: int
+    board: tuple[int, int]
+    score: int
+    length: int
+    steps: int
+    game_status: GameStatus
+
+
+_policies = {}  # Policies, that have already been imported by the worker process
+
+
+def load_policy(policy_path: str):
+    """
+    Import the policy function from the path in the format "module:function".
+
+    E.g. "agents.basic_policies:greedy_policy".
+
+    :param policy_path: Import path of the policy.
+    :return: Policy function.
+    """
+    if policy_path not in _policies:
+        module_name, _, function_name = policy_path.partition(":")
+        if not function_name:
+            raise ValueError(f"Invalid policy path: {policy_path}. Policy must be given as 'module:function'.")
+        _policies[policy_path] = getattr(importlib.import_module(module_name), function_name)
+    return _policies[policy_path]
+
+
+def play_game(task: GameTask) -> GameResult:
+    """
+    Play a single seeded game with the task's policy until the game ends or the step limit is reached.
+
+    :param task: Tournament game to play.
+    :return: Outcome of the game.
+    """
+    policy = load_policy(task.policy)
+    random.seed(task.seed)  # Policies, that make random decisions, use the global random module
+    engine = Engine(Brain(task.board[0], task.board[1], [], seed=task.seed))
+    engine.run(policy, task.max_steps)
+    brain = engine.brain
+    return GameResult(task.policy, task.seed, task.board, brain.current_score, brain.snake.length(),
+                      engine.steps, brain.game_status)
+
+
+def tournament_tasks(policies: list[str], seeds: list[int], boards: list[tuple[int, int]],
+                     max_steps: int) -> Iterator[GameTask]:
+    """Create a game task for every combination of policy, board size and seed."""
+    for board in boards:
+        for policy in policies:
+            for seed in seeds:
+                yield GameTask(policy, seed, board, max_steps)
+
+
+def run_tournament(policies: list[str], seeds: list[int], boards: list[tuple[int, int]],
+                   max_steps: int = 100_000, processes: int = None, chunksize: int = 16) -> Iterator[GameResult]:
+    """
+    Play the tournament games across a process pool and yield the results in the order they finish.
+
+    :param policies: Import paths of the policies in the format "module:function".
+    :param seeds: Seeds of the games, that every policy plays on every board size.
+    :param boards: Game area sizes (width, height) measured in in-game blocks.
+    :param max_steps: Maximum amount of steps per game.
+    :param processes: Amount of worker processes. If set to None (default), all CPU cores are used.
+    :param chunksize: Amount of games sent to a worker at once, to reduce the inter-process communication overhead.
+    """
+    for policy in policies:
+        load_policy(policy)  # Fail early on invalid policy paths, before starting the workers
+
+    with Pool(processes) as pool:
+        yield from pool.imap_unordered(play_game, tournament_tasks(policies, seeds, boards, max_steps), chunksize)
+
+
+class TournamentReport:
+    """Aggregated tournament results per policy and board size."""
+
+    def __init__(self):
+        """Tournament Report constructor method."""
+        self.totals = {}  # (policy, board) -> [games, score, length, steps, wins]
+
+    def add(self, result: GameResult) -> None:
+        """Add the outcome of a game to the report."""
+        totals = self.totals.setdefault((result.policy, result.board), [0, 0, 0, 0, 0])
+        totals[0] += 1
+        totals[1] += result.score
+        totals[2] += result.length
+        totals[3] += result.steps
+        totals[4] += result.game_status == GameStatus.WON
+
+    def summary(self) -> list[dict]:
+        """
+        Summarize the results.
+
+        :return: List of averages per policy and board size, sorted by the board size and the average score.
+        """
+        rows = []
+        for (policy, board), (games, score, length, steps, wins) in self.totals.items():
+            rows.append({
+                "policy": policy,
+                "board": f"{board[0]}x{board[1]}",
+                "games": games,
+                "score": score / games,
+                "length": length / games,
+                "steps": steps / games,
+                "win_rate": wins / games,
+            })
+        return sorted(rows, key=lambda row: (parse_board(row["board"]), -row["score"]))
+
+    def format_table(self) -> str:
+        """Format the summary as a text table."""
+        lines = [f"{'policy':<45} {'board':>9} {'games':>7} {'score':>9} {'length':>9} {'steps':>10} {'win rate':>9}"]
+        for row in self.summary():
+            lines.append(f"{row['policy']:<45} {row['board']:>9} {row['games']:>7} {row['score']:>9.2f} "
+                         f"{row['length']:>9.2f} {row['steps']:>10.1f} {row['win_rate']:>9.2%}")
+        return "\n".join(lines)
+
+
+def parse_board(board: str) -> tuple[int, int]:
+    """Parse the board size in the format "WIDTHxHEIGHT" (e.g. "80x60")."""
+    width, _, height = board.lower().partition("x")
+    return int(width), int(height)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rank snake policies by playing seeded games across a process pool.")
+    parser.add_argument("policies", nargs="+", help="Policies to rank in the format 'module:function'.")
+    parser.add_argument("--seeds", type=int, default=100, help="Amount of seeded games per policy and board size.")
+    parser.add_argument("--first-seed", type=int, default=0, help="Seed of the first game.")
+    parser.add_argument("--boards", nargs="+", type=parse_board, default=[(80, 60)],
+                        help="Game area sizes in the format 'WIDTHxHEIGHT'.")
+    parser.add_argument("--max-steps", type=int, default=100_000, help="Maximum amount of steps per game.")
+    parser.add_argument("--processes", type=int, default=None, help="Amount of worker processes (default: all cores).")
+    parser.add_argument("--chunksize", type=int, default=16, help="Amount of games sent to a worker at once.")
+    parser.add_argument("--json", dest="json_path", help="Write the summary to the given JSON file.")
+    args = parser.parse_args()
+
+    seeds = list(range(args.first_seed, args.first_seed + args.seeds))
+    total_games = len(args.policies) * len(seeds) * len(args.boards)
+
+    report = TournamentReport()
+    start_time = time.perf_counter()
+    for finished_games, result in enumerate(run_tournament(args.policies, seeds, args.boards, args.max_steps,
+                                                           args.processes, args.chunksize), 1):
+        report.add(result)
+        if finished_games % max(1, total_games // 20) == 0 or finished_games == total_games:
+            print(f"{finished_games}/{total_games} games finished", flush=True)
+    elapsed_time = time.perf_counter() - start_time
+
+    print(report.format_table())
+    print(f"{total_games} games in {elapsed_time:.2f} s ({total_games / elapsed_time:.1f} games/s)")
+
+    if args.json_path:
+        with open(args.json_path, "w") as json_file:
+            json.dump(report.summary(), json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
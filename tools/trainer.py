@@ -0,0 +1,252 @@
+"""
+Neuroevolution trainer to evolve small neural network policies with a genetic algorithm.
+
+Every genome holds the weights of a network with one hidden layer, that maps the vector observation
+of the game environment (see SnakeEnv) to a score for each action. The fitness of a genome is the average
+outcome of several seeded games (every genome of a generation plays the same seeds).
+
+The population is split into chunks, that are evaluated across a process pool. A worker plays all the games
+of its chunk in lockstep with the headless environments, and selects the actions of all the games at once
+with a single vectorized forward pass through the networks of the whole chunk.
+
+After every generation the population is written to a checkpoint (.npz), which the training can be resumed from.
+
+Usage (from the repository root):
+
+    python -m tools.trainer --generations 100 --population 256 --games 5 --board 20x20 --checkpoint-dir checkpoints
+    python -m tools.trainer --generations 100 --resume checkpoints/generation_0042.npz
+"""
+import argparse
+import os
+import time
+from multiprocessing import Pool
+from typing import NamedTuple
+
+import numpy as np
+
+from components.environment import ACTIONS, VECTOR_SIZE, SnakeEnv
+from enums.observation_mode import ObservationMode
+from tools.tournament import parse_board
+
+# Fitness of a game: points scored plus a small reward for every step survived (so the first generations,
+# which rarely score, can still be told apart)
+STEP_REWARD = 0.001
+
+
+class EvaluationTask(NamedTuple):
+    """A chunk of the population to be evaluated by a worker process."""
+    genomes: np.ndarray  # Genomes of the chunk (genome count, genome size)
+    seeds: list[int]  # Seeds of the games, that every genome plays
+    board: tuple[int, int]  # Game area width and height in in-game blocks
+    hidden_size: int
+    max_steps: int  # Maximum amount of steps per game
+    starvation_steps: int  # Maximum amount of steps without scoring, after which the game is stopped
+
+
+def genome_size(hidden_size: int) -> int:
+    """Amount of weights of a network with the given hidden layer size."""
+    return VECTOR_SIZE * hidden_size + hidden_size + hidden_size * len(ACTIONS) + len(ACTIONS)
+
+
+def unpack_networks(genomes: np.ndarray, hidden_size: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Split the genomes into the weights and biases of their networks (views of the genomes, nothing is copied).
+
+    :param genomes: Genomes (genome count, genome size).
+    :param hidden_size: Size of the networks' hidden layer.
+    :return: Hidden weights (n, VECTOR_SIZE, hidden_size), hidden biases (n, hidden_size),
+             output weights (n, hidden_size, actions) and output biases (n, actions).
+    """
+    count, action_count = len(genomes), len(ACTIONS)
+    sizes = [VECTOR_SIZE * hidden_size, hidden_size, hidden_size * action_count, action_count]
+    hidden_weights, hidden_biases, output_weights, output_biases = np.split(genomes, np.cumsum(sizes)[:-1], axis=1)
+    return (hidden_weights.reshape(count, VECTOR_SIZE, hidden_size), hidden_biases,
+            output_weights.reshape(count, hidden_size, action_count), output_biases)
+
+
+def forward(observations: np.ndarray, networks: tuple) -> np.ndarray:
+    """
+    Compute the action scores of many networks at once, each network gets its own observation.
+
+    :param observations: Observations (n, VECTOR_SIZE).
+    :param networks: Weights and biases of n networks (see unpack_networks).
+    :return: Action scores (n, actions).
+    """
+    hidden_weights, hidden_biases, output_weights, output_biases = networks
+    hidden = np.tanh(np.einsum("ni,nih->nh", observations, hidden_weights) + hidden_biases)
+    return np.einsum("nh,nha->na", hidden, output_weights) + output_biases
+
+
+def evaluate_genomes(task: EvaluationTask) -> np.ndarray:
+    """
+    Play the task's seeded games with every genome of the chunk and compute the genomes' fitness.
+
+    All the games are played in lockstep: every step, the actions of all the ongoing games are selected
+    with a single forward pass, then every ongoing game is advanced by one step.
+
+    :param task: Chunk of the population to evaluate.
+    :return: Fitness of every genome (average fitness of its games).
+    """
+    genome_count, game_count = len(task.genomes), len(task.seeds)
+    envs = [SnakeEnv(task.board[0], task.board[1], observation_mode=ObservationMode.VECTOR,
+                     max_steps=task.max_steps) for _ in range(genome_count * game_count)]
+    # Game i is played by genome i // game_count with seed task.seeds[i % game_count]
+    networks = tuple(np.repeat(array, game_count, axis=0) for array in unpack_networks(task.genomes,
+                                                                                        task.hidden_size))
+    observations = np.empty((len(envs), VECTOR_SIZE), dtype=np.float32)
+    for index, env in enumerate(envs):
+        observations[index] = env.reset(task.seeds[index % game_count])[0]
+
+    fitness = np.zeros(len(envs))
+    steps_without_scoring = np.zeros(len(envs), dtype=np.int64)
+    ongoing = np.arange(len(envs))
+    while ongoing.size:
+        actions = forward(observations[ongoing], tuple(array[ongoing] for array in networks)).argmax(axis=1)
+        still_ongoing = []
+        for index, action in zip(ongoing.tolist(), actions.tolist()):
+            observation, reward, terminated, truncated, info = envs[index].step(action)
+            observations[index] = observation
+            steps_without_scoring[index] = 0 if info["score"] > fitness[index] else steps_without_scoring[index] + 1
+            fitness[index] = info["score"]
+            if not (terminated or truncated or steps_without_scoring[index] >= task.starvation_steps):
+                still_ongoing.append(index)
+        ongoing = np.array(still_ongoing, dtype=np.int64)
+
+    steps = np.array([env.engine.steps for env in envs])
+    return (fitness + STEP_REWARD * steps).reshape(genome_count, game_count).mean(axis=1)
+
+
+def evaluate_population(pool: Pool, genomes: np.ndarray, seeds: list[int], board: tuple[int, int],
+                        hidden_size: int, max_steps: int, starvation_steps: int, chunk_count: int) -> np.ndarray:
+    """
+    Evaluate the population across the process pool.
+
+    :param pool: Pool of the worker processes.
+    :param genomes: Genomes of the population (population size, genome size).
+    :param seeds: Seeds of the games, that every genome plays.
+    :param board: Game area width and height in in-game blocks.
+    :param hidden_size: Size of the networks' hidden layer.
+    :param max_steps: Maximum amount of steps per game.
+    :param starvation_steps: Maximum amount of steps without scoring, after which a game is stopped.
+    :param chunk_count: Amount of chunks, that the population is split into.
+    :return: Fitness of every genome.
+    """
+    tasks = [EvaluationTask(chunk, seeds, board, hidden_size, max_steps, starvation_steps)
+             for chunk in np.array_split(genomes, chunk_count) if len(chunk)]
+    return np.concatenate(pool.map(evaluate_genomes, tasks, chunksize=1))
+
+
+def next_generation(genomes: np.ndarray, fitness: np.ndarray, rng: np.random.Generator, elite_count: int,
+                    tournament_size: int, mutation_rate: float, mutation_scale: float) -> np.ndarray:
+    """
+    Breed the next generation of the population.
+
+    The elite (the fittest genomes) is kept unchanged. The rest of the population is bred from parents picked
+    by tournament selection: the genes of two parents are mixed (uniform crossover), then a portion of the genes
+    is mutated with Gaussian noise.
+
+    :param genomes: Genomes of the current population (population size, genome size).
+    :param fitness: Fitness of every genome.
+    :param rng: Random number generator.
+    :param elite_count: Amount of the fittest genomes, that are kept unchanged.
+    :param tournament_size: Amount of genomes competing to become each parent.
+    :param mutation_rate: Probability of a gene being mutated.
+    :param mutation_scale: Standard deviation of the mutation noise.
+    :return: Genomes of the next generation.
+    """
+    population_size, size = genomes.shape
+    child_count = population_size - elite_count
+    elite = genomes[np.argsort(fitness)[::-1][:elite_count]]
+
+    # Tournament selection of two parents per child, the fittest competitor of each tournament wins
+    competitors = rng.integers(population_size, size=(2, child_count, tournament_size))
+    winners = np.take_along_axis(competitors, fitness[competitors].argmax(axis=2)[..., None], axis=2)[..., 0]
+    first_parents, second_parents = genomes[winners[0]], genomes[winners[1]]
+
+    children = np.where(rng.random((child_count, size)) < 0.5, first_parents, second_parents)
+    mutated = rng.random((child_count, size)) < mutation_rate
+    children += mutated * rng.normal(0, mutation_scale, (child_count, size)).astype(genomes.dtype)
+    return np.concatenate([elite, children])
+
+
+def save_checkpoint(path: str, generation: int, genomes: np.ndarray, fitness: np.ndarray,
+                    hidden_size: int, board: tuple[int, int]) -> None:
+    """Write the generation's population and its fitness to the checkpoint file (.npz)."""
+    np.savez(path, generation=generation, genomes=genomes, fitness=fitness, hidden_size=hidden_size,
+             board=np.array(board))
+
+
+def load_checkpoint(path: str) -> dict:
+    """
+    Read the checkpoint file (see save_checkpoint).
+
+    :return: Dictionary with the generation, genomes, fitness, hidden_size and board of the checkpoint.
+    """
+    with np.load(path) as checkpoint:
+        return {
+            "generation": int(checkpoint["generation"]),
+            "genomes": checkpoint["genomes"],
+            "fitness": checkpoint["fitness"],
+            "hidden_size": int(checkpoint["hidden_size"]),
+            "board": tuple(int(value) for value in checkpoint["board"]),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Evolve neural network policies with a genetic algorithm.")
+    parser.add_argument("--generations", type=int, default=50, help="Amount of generations to train.")
+    parser.add_argument("--population", type=int, default=256, help="Amount of genomes in the population.")
+    parser.add_argument("--games", type=int, default=5, help="Amount of seeded games per genome and generation.")
+    parser.add_argument("--board", type=parse_board, default=(20, 20), help="Game area size 'WIDTHxHEIGHT'.")
+    parser.add_argument("--hidden-size", type=int, default=16, help="Size of the networks' hidden layer.")
+    parser.add_argument("--max-steps", type=int, default=5000, help="Maximum amount of steps per game.")
+    parser.add_argument("--starvation-steps", type=int, default=None,
+                        help="Steps without scoring, after which a game is stopped (default: the game area size).")
+    parser.add_argument("--elite", type=int, default=8, help="Amount of the fittest genomes kept unchanged.")
+    parser.add_argument("--tournament-size", type=int, default=4, help="Amount of genomes competing per parent.")
+    parser.add_argument("--mutation-rate", type=float, default=0.1, help="Probability of a gene being mutated.")
+    parser.add_argument("--mutation-scale", type=float, default=0.3, help="Standard deviation of the mutations.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the training (population and game seeds).")
+    parser.add_argument("--processes", type=int, default=None, help="Amount of worker processes (default: all cores).")
+    parser.add_argument("--chunks-per-process", type=int, default=4,
+                        help="Amount of population chunks per worker process (balances the uneven game lengths).")
+    parser.add_argument("--checkpoint-dir", default="checkpoints", help="Directory of the generation checkpoints.")
+    parser.add_argument("--resume", help="Continue the training from the given checkpoint.")
+    args = parser.parse_args()
+
+    first_generation = 0
+    board, hidden_size = args.board, args.hidden_size
+    if args.resume:
+        checkpoint = load_checkpoint(args.resume)
+        board, hidden_size = checkpoint["board"], checkpoint["hidden_size"]
+        first_generation = checkpoint["generation"] + 1
+        rng = np.random.default_rng([args.seed, first_generation])
+        genomes = next_generation(checkpoint["genomes"], checkpoint["fitness"], rng, args.elite,
+                                  args.tournament_size, args.mutation_rate, args.mutation_scale)
+    else:
+        rng = np.random.default_rng(args.seed)
+        genomes = rng.normal(0, 1, (args.population, genome_size(hidden_size))).astype(np.float32)
+    starvation_steps = args.starvation_steps or board[0] * board[1]
+    os.makedirs(args.checkpoint_dir, exist_ok=True)
+
+    chunk_count = (args.processes or os.cpu_count()) * args.chunks_per_process
+    with Pool(args.processes) as pool:
+        for generation in range(first_generation, first_generation + args.generations):
+            seeds = rng.integers(2 ** 32, size=args.games).tolist()  # Every generation plays new games
+            start_time = time.perf_counter()
+            fitness = evaluate_population(pool, genomes, seeds, board, hidden_size, args.max_steps,
+                                          starvation_steps, chunk_count)
+            elapsed_time = time.perf_counter() - start_time
+
+            save_checkpoint(os.path.join(args.checkpoint_dir, f"generation_{generation:04d}.npz"), generation,
+                            genomes, fitness, hidden_size, board)
+            games = len(genomes) * len(seeds)
+            print(f"generation {generation:>4}: best fitness {fitness.max():8.3f}, mean fitness {fitness.mean():8.3f}, "
+                  f"{games} games in {elapsed_time:.2f} s ({games / elapsed_time:.1f} games/s)", flush=True)
+
+            genomes = next_generation(genomes, fitness, rng, args.elite, args.tournament_size,
+                                      args.mutation_rate, args.mutation_scale)
+
+
+if __name__ == "__main__":
+    main()
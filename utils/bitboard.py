@@ -0,0 +1,245 @@
+import random
+
+
+class FreeCellBitboard:
+    """
+    Bitboard of the free game area positions, that stores one bit per position (1 - free, 0 - occupied).
+
+    It can be used instead of the free cell index, as it provides the same operations (occupying and freeing
+    a position, counting and checking the free positions and selecting a random free position).
+    Occupying and freeing a position take constant time, as the bits are stored in a bytearray.
+
+    For queries the bits are converted to a single integer, where the bits are word-parallel:
+    counting the free positions in a region or finding the positions reachable from a position (flood fill)
+    takes a handful of integer operations per step, instead of a set operation per position.
+
+    Positions are stored row by row, each row is followed by an unused guard bit (which is always 0),
+    so shifting the bits left or right never moves a position into the neighbouring row.
+    """
+
+    def __init__(self, left: int, top: int, width: int, height: int):
+        """
+        Free Cell Bitboard constructor method.
+
+        All the positions of the rectangular area are free at the start.
+
+        :param left: Area's left edge x-coordinate measured in in-game blocks.
+        :param top: Area's top edge y-coordinate measured in in-game blocks.
+        :param width: Area's width measured in in-game blocks.
+        :param height: Area's height measured in in-game blocks.
+        """
+        self.left, self.top, self.width, self.height = left, top, width, height
+        self.stride = width + 1  # Bits per row, including the guard bit
+        self.area_mask = self.region_mask(left, top, width, height)  # Bits of all the positions inside the area
+        self.bits = bytearray(self.area_mask.to_bytes((self.stride * height + 7) // 8, "little"))
+        self.free_count = width * height
+        self.column_free = [height] * width  # Amount of free positions in each column (for the rank selection)
+
+    def __len__(self) -> int:
+        """Amount of free positions."""
+        return self.free_count
+
+    def __contains__(self, position: tuple[int, int]) -> bool:
+        """Check if the position is free."""
+        if not self.in_area(position):
+            return False
+        bit = self.position_bit(position)
+        return bool(self.bits[bit >> 3] & (1 << (bit & 7)))
+
+    def __iter__(self):
+        """Iterate over the free positions in sorted order (takes time proportional to the size of the area)."""
+        return self.positions(self.bits)
+
+    def in_area(self, position: tuple[int, int]) -> bool:
+        """Check if the position (x, y) is inside the area."""
+        x, y = position
+        return self.left <= x < self.left + self.width and self.top <= y < self.top + self.height
+
+    def position_bit(self, position: tuple[int, int]) -> int:
+        """Get the index of the position's (x, y) bit."""
+        x, y = position
+        return (y - self.top) * self.stride + (x - self.left)
+
+    def add(self, position: tuple[int, int]) -> None:
+        """
+        Mark the position as free.
+
+        Positions, that are already free or outside the area, are ignored.
+
+        :param position: Position (x, y) that has been freed.
+        """
+        if not self.in_area(position):
+            return
+        bit = self.position_bit(position)
+        byte, mask = bit >> 3, 1 << (bit & 7)
+        if not self.bits[byte] & mask:
+            self.bits[byte] |= mask
+            self.free_count += 1
+            self.column_free[position[0] - self.left] += 1
+
+    def discard(self, position: tuple[int, int]) -> None:
+        """
+        Mark the position as occupied.
+
+        Positions, that are not free (e.g. already occupied or outside the game area), are ignored.
+
+        :param position: Position (x, y) that has been occupied.
+        """
+        if not self.in_area(position):
+            return
+        bit = self.position_bit(position)
+        byte, mask = bit >> 3, 1 << (bit & 7)
+        if self.bits[byte] & mask:
+            self.bits[byte] &= ~mask
+            self.free_count -= 1
+            self.column_free[position[0] - self.left] -= 1
+
+    def random_position(self, rng: random.Random = None) -> tuple[int, int]:
+        """
+        Select a free position uniformly at random.
+
+        The selection is made the same way as by the free cell index, so both select the same positions:
+        random positions are drawn while many positions are free, otherwise the k-th free position in sorted
+        order is selected (see select_free_position).
+
+        :param rng: Random number generator to make the selection with.
+                    If not provided, the global random module is used.
+        :return: Randomly selected free position (x, y).
+        :raises IndexError: If there are no free positions left.
+        """
+        rng = rng or random
+        if self.free_count * self.free_count > self.width * self.height:
+            while True:
+                position = self.left + rng.randrange(self.width), self.top + rng.randrange(self.height)
+                if position in self:
+                    return position
+        if self.free_count == 0:
+            raise IndexError("Cannot choose from an empty sequence")
+        return self.select_free_position(rng.randrange(self.free_count))
+
+    def select_free_position(self, rank: int) -> tuple[int, int]:
+        """
+        Find the free position with the given rank in sorted order (by x, then by y, see positions).
+
+        The column is found from the per-column counts of the free positions, then the position is found
+        among the column's bits, so the selection takes time proportional to the width and the height of the area.
+
+        :param rank: Index of the free position in sorted order (0 <= rank < amount of free positions).
+        :return: Free position (x, y).
+        """
+        for column, free_count in enumerate(self.column_free):
+            if rank < free_count:
+                break
+            rank -= free_count
+        bits, stride = self.bits, self.stride
+        for bit in range(column, stride * self.height, stride):
+            if bits[bit >> 3] & (1 << (bit & 7)):
+                if rank == 0:
+                    return self.left + column, self.top + bit // stride
+                rank -= 1
+
+    # ----------------------------------- WORD-PARALLEL QUERIES ----------------------------------
+
+    def to_int(self) -> int:
+        """Get the bits of the free positions as an integer."""
+        return int.from_bytes(self.bits, "little")
+
+    def region_mask(self, left: int, top: int, width: int, height: int) -> int:
+        """
+        Get the bits of the rectangular region's positions (clipped to the area).
+
+        :param left: Region's left edge x-coordinate measured in in-game blocks.
+        :param top: Region's top edge y-coordinate measured in in-game blocks.
+        :param width: Region's width measured in in-game blocks.
+        :param height: Region's height measured in in-game blocks.
+        """
+        x_start, x_end = max(left, self.left) - self.left, min(left + width, self.left + self.width) - self.left
+        y_start, y_end = max(top, self.top) - self.top, min(top + height, self.top + self.height) - self.top
+        if x_start >= x_end or y_start >= y_end:
+            return 0
+        row_mask = ((1 << (x_end - x_start)) - 1) << x_start
+        rows = y_end - y_start
+        # Repeat the row mask on every row of the region, doubling the amount of repeated rows each time
+        mask, repeated_rows = row_mask, 1
+        while repeated_rows < rows:
+            mask |= mask << (repeated_rows * self.stride)
+            repeated_rows *= 2
+        mask &= (1 << (rows * self.stride)) - 1
+        return mask << (y_start * self.stride)
+
+    def count_free_in_region(self, left: int, top: int, width: int, height: int) -> int:
+        """Count the free positions in the rectangular region."""
+        return (self.to_int() & self.region_mask(left, top, width, height)).bit_count()
+
+    def any_free_in_region(self, left: int, top: int, width: int, height: int) -> bool:
+        """Check if there are any free positions in the rectangular region."""
+        return bool(self.to_int() & self.region_mask(left, top, width, height))
+
+    def flood_fill(self, start: tuple[int, int], passable: int = None) -> int:
+        """
+        Find the positions reachable from the start position by moving through the passable positions.
+
+        Each step of the fill expands the reached positions to all their neighbours at once.
+
+        :param start: Position (x, y) to start from (it does not have to be passable, e.g. the snake's head).
+        :param passable: Bits of the passable positions. If set to None (default), the free positions are passable.
+        :return: Bits of the reachable passable positions (the start position is included only if it is passable).
+        """
+        if passable is None:
+            passable = self.to_int()
+        if not self.in_area(start):
+            return 0
+        start_bit = 1 << self.position_bit(start)
+        reached = start_bit
+        while True:
+            expanded = (self.spread(reached) & passable) | start_bit
+            if expanded == reached:
+                return reached & passable
+            reached = expanded
+
+    def is_reachable(self, start: tuple[int, int], target: tuple[int, int], passable: int = None) -> bool:
+        """
+        Check if the target position can be reached from the start position through the passable positions.
+
+        The target does not have to be passable (e.g. the snake's tail).
+        The fill stops as soon as the target has been reached.
+
+        :param start: Position (x, y) to start from.
+        :param target: Position (x, y) to reach.
+        :param passable: Bits of the passable positions. If set to None (default), the free positions are passable.
+        """
+        if not self.in_area(start) or not self.in_area(target):
+            return False
+        if passable is None:
+            passable = self.to_int()
+        target_bit = 1 << self.position_bit(target)
+        passable |= target_bit
+        reached = 1 << self.position_bit(start)
+        while not reached & target_bit:
+            expanded = (self.spread(reached) & passable) | reached
+            if expanded == reached:
+                return False
+            reached = expanded
+        return True
+
+    def spread(self, bits: int) -> int:
+        """Expand the bits to their neighbouring positions (left, right, up and down) in a single step."""
+        stride = self.stride
+        return bits | (bits << 1) | (bits >> 1) | (bits << stride) | (bits >> stride)
+
+    def count_reachable(self, start: tuple[int, int], passable: int = None) -> int:
+        """Count the passable positions reachable from the start position (see flood_fill)."""
+        return self.flood_fill(start, passable).bit_count()
+
+    def positions(self, bits):
+        """
+        Iterate over the positions of the bits in sorted order (by x, then by y).
+
+        :param bits: Bits of the positions as an integer (e.g. the result of a flood fill) or as bytes.
+        """
+        if isinstance(bits, int):
+            bits = bits.to_bytes(len(self.bits), "little")
+        for x in range(self.width):
+            for bit in range(x, self.stride * self.height, self.stride):
+                if bits[bit >> 3] & (1 << (bit & 7)):
+                    yield self.left + x, self.top + bit // self.stride
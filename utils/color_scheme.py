@@ -43,7 +43,8 @@ class ColorScheme:
         """
         self.scheme_name = scheme_name
 
-        self.color_mode = color_mode
+        self.snake_colors = []  # Cached colors of the snake's positions, from the head to the tail
+        self._color_mode = color_mode
 
         self.head_color = head_color
         self.tail_color = tail_color
@@ -54,6 +55,97 @@ class ColorScheme:
 
         self.text_color = text_color if text_color is not None else colors.BLACK
 
+    @property
+    def color_mode(self) -> ColorMode:
+        """Color mode for the snake pattern."""
+        return self._color_mode
+
+    @color_mode.setter
+    def color_mode(self, color_mode: ColorMode) -> None:
+        """Change the color mode for the snake pattern, which invalidates the cached snake colors."""
+        self._color_mode = color_mode
+        self.invalidate_snake_colors()
+
+    def invalidate_snake_colors(self) -> None:
+        """Clear the cached snake colors (needed after changing the pattern, the head or the tail color)."""
+        self.snake_colors = []
+
+    def get_snake_colors(self, snake_length: int) -> list[tuple[int, int, int]]:
+        """
+        Get the colors of the snake's positions, from the head to the tail.
+
+        The colors are cached, so they are assigned only when the snake's length changes.
+        In the SOLID and PATTERN_REPEAT color modes the body colors do not depend on the snake's length,
+        so when the snake grows only the new positions are assigned a color.
+        In the PATTERN_ONCE color mode the segments depend on the snake's length, so the colors are re-assigned.
+
+        :param snake_length: Amount of the snake's positions.
+        :return: List of colors, one for each of the snake's positions.
+        """
+        snake_colors = self.snake_colors
+        cached_length = len(snake_colors)
+        if cached_length == snake_length:
+            return snake_colors
+
+        if self._color_mode == ColorMode.PATTERN_ONCE or cached_length < 2 or cached_length > snake_length:
+            self.snake_colors = self.assign_snake_colors(snake_length)
+            return self.snake_colors
+
+        # Extend the cached colors with the new positions' colors
+        pattern_start = 0 if self.head_color is None else 1
+        if self.tail_color is not None:
+            snake_colors.pop()
+        body_pattern = self.body_pattern
+        pattern_length = len(body_pattern)
+        pattern_end = snake_length if self.tail_color is None else snake_length - 1
+        for index in range(len(snake_colors), pattern_end):
+            snake_colors.append(body_pattern[(index - pattern_start) % pattern_length])
+        if self.tail_color is not None:
+            snake_colors.append(self.tail_color)
+        return snake_colors
+
+    def assign_snake_colors(self, snake_length: int) -> list[tuple[int, int, int]]:
+        """
+        Assign the colors of the snake's positions, from the head to the tail.
+
+        If the head or the tail color is set, the head or the tail is assigned the color, and the body pattern
+        is assigned to the rest of the positions.
+        In the PATTERN_ONCE color mode, the body pattern is assigned once across the snake's body
+        (the segments get longer starting from the head), otherwise the pattern is repeated until the end of the snake.
+
+        :param snake_length: Amount of the snake's positions.
+        :return: List of colors, one for each of the snake's positions.
+        """
+        pattern_start = 0 if self.head_color is None else 1
+        pattern_end = snake_length if self.tail_color is None else snake_length - 1
+        body_pattern = self.body_pattern
+        pattern_length = len(body_pattern)
+
+        snake_colors = [self.head_color] * pattern_start
+        if self._color_mode == ColorMode.PATTERN_ONCE:
+            pattern_index = 0
+            base_segment_length = snake_length // pattern_length
+            extra_segments = snake_length % pattern_length
+
+            segment_counter = base_segment_length if extra_segments <= 0 else base_segment_length + 1
+            for _ in range(pattern_start, pattern_end):
+                snake_colors.append(body_pattern[pattern_index])
+                segment_counter -= 1
+                if segment_counter <= 0:
+                    pattern_index += 1
+                    extra_segments -= 1  # Remove an extra segment, before re-calculating, in case it was just used up.
+                    segment_counter = base_segment_length if extra_segments <= 0 else base_segment_length + 1
+        else:
+            for index in range(pattern_start, pattern_end):
+                snake_colors.append(body_pattern[(index - pattern_start) % pattern_length])
+
+        if self.tail_color is not None:
+            if len(snake_colors) == snake_length:
+                snake_colors[-1] = self.tail_color  # A snake of length 1 is both the head and the tail
+            else:
+                snake_colors.append(self.tail_color)
+        return snake_colors
+
     @staticmethod
     def get_default_color_scheme():
         """
@@ -0,0 +1,152 @@
+import numpy as np
+
+
+class FeaturePlanes:
+    """
+    Grid planes of the game board for agents, that are updated incrementally as the game changes.
+
+    Planes (NumPy arrays indexed as [y, x], covering the whole display including the borders):
+        * walls - 1 on the borders, computed once,
+        * head - 1 on the snake's head,
+        * food - 1 on the food,
+        * occupancy - amount of the snake's body positions on each cell,
+        * body_serial - serial number of the latest body position on each occupied cell (see Snake.head_serial).
+
+    The planes are kept up to date as a body observer of the snake (see Snake.attach_body_observer) and by the brain
+    when the food changes, so a step updates only the head, the tail and the food cells, instead of the whole body.
+
+    Body age (the amount of steps until a cell frees up, e.g. for planning) is not stored cell by cell,
+    as it changes on every cell on every step. It is derived from the serial numbers instead:
+    steps until free = body_serial - tail_serial + 1, where tail_serial is the serial of the snake's tail
+    (see steps_until_free and body_age).
+    """
+
+    def __init__(self, display_width: int, display_height: int, borders: list[list[int, int, int, int]]):
+        """
+        Feature Planes constructor method.
+
+        :param display_width: Width of the display (game area with the borders) measured in in-game blocks.
+        :param display_height: Height of the display (game area with the borders) measured in in-game blocks.
+        :param borders: List of border rectangles [x, y, width, height] (see Brain.get_borders).
+        """
+        shape = (display_height, display_width)
+        self.walls = np.zeros(shape, dtype=np.uint8)
+        for x, y, width, height in borders:
+            self.walls[y:y + height, x:x + width] = 1
+        self.head = np.zeros(shape, dtype=np.uint8)
+        self.food = np.zeros(shape, dtype=np.uint8)
+        self.occupancy = np.zeros(shape, dtype=np.int32)
+        self.body_serial = np.zeros(shape, dtype=np.int64)
+        self._occupied_mask = np.zeros(shape, dtype=np.bool_)  # Preallocated buffer of body_age
+
+        self.snake = None  # Snake, whose body positions are observed
+        self.head_position = None
+        self.head_serial = None
+        self.food_position = None
+
+    def in_grid(self, position: tuple[int, int]) -> bool:
+        """Check if the position (x, y) is on the planes (positions beyond the display are not stored)."""
+        x, y = position
+        return 0 <= y < self.walls.shape[0] and 0 <= x < self.walls.shape[1]
+
+    # ------------------------------------ BODY OBSERVER METHODS -----------------------------------
+
+    def clear(self) -> None:
+        """Remove all the snake's body positions from the planes."""
+        self.head.fill(0)
+        self.occupancy.fill(0)
+        self.body_serial.fill(0)
+        self.head_position = self.head_serial = None
+
+    def add(self, position: tuple[int, int], serial: int) -> None:
+        """
+        Add a snake's body position to the planes.
+
+        :param position: Coordinates (x, y) of the body position.
+        :param serial: Serial number of the body position.
+        """
+        if self.head_serial is None or serial > self.head_serial:  # The position is the new head
+            self.set_head(position, serial)
+        if not self.in_grid(position):
+            return
+        x, y = position
+        self.occupancy[y, x] += 1
+        if self.occupancy[y, x] == 1 or serial > self.body_serial[y, x]:
+            self.body_serial[y, x] = serial
+
+    def remove(self, position: tuple[int, int], serial: int) -> None:
+        """
+        Remove a snake's body position from the planes.
+
+        :param position: Coordinates (x, y) of the body position.
+        :param serial: Serial number of the body position.
+        """
+        if serial == self.head_serial:  # The head has been removed (the move was undone)
+            self.set_head(self.snake.get_head_position(), serial - 1)
+        if not self.in_grid(position):
+            return
+        x, y = position
+        self.occupancy[y, x] -= 1
+        if self.occupancy[y, x] == 0:
+            self.body_serial[y, x] = 0
+        elif self.body_serial[y, x] == serial:
+            # The latest of the overlapping body positions has been removed (only when undoing a collision),
+            # find the latest of the remaining ones
+            snake = self.snake
+            index = snake.body_positions.index(position)
+            self.body_serial[y, x] = snake.head_serial - index
+
+    def set_head(self, position: tuple[int, int], serial: int) -> None:
+        """Move the head to the position."""
+        if self.head_position is not None and self.in_grid(self.head_position):
+            self.head[self.head_position[1], self.head_position[0]] = 0
+        self.head_position, self.head_serial = position, serial
+        if self.in_grid(position):
+            self.head[position[1], position[0]] = 1
+
+    # ------------------------------------------- FOOD -------------------------------------------
+
+    def set_food(self, position: tuple[int, int] = None) -> None:
+        """
+        Move the food to the position.
+
+        :param position: Coordinates (x, y) of the food or None if there is no food on the board.
+        """
+        if self.food_position is not None:
+            self.food[self.food_position[1], self.food_position[0]] = 0
+        self.food_position = position
+        if position is not None:
+            self.food[position[1], position[0]] = 1
+
+    # ----------------------------------------- BODY AGE -----------------------------------------
+
+    def tail_serial(self) -> int:
+        """Serial number of the snake's tail position."""
+        return self.snake.head_serial - self.snake.length() + 1
+
+    def steps_until_free(self, position: tuple[int, int]) -> int:
+        """
+        Get the amount of steps until the cell frees up, if the snake does not grow (0 if the cell is free).
+
+        :param position: Coordinates (x, y) of the cell.
+        """
+        x, y = position
+        if not self.in_grid(position) or not self.occupancy[y, x]:
+            return 0
+        return int(self.body_serial[y, x]) - self.tail_serial() + 1
+
+    def body_age(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Get the plane of the amount of steps until each cell frees up (0 on the free cells).
+
+        The plane is computed with array operations from the serial numbers (no iteration over the snake's body).
+
+        :param out: Array of the planes' shape to write the result into, to avoid allocating a new array.
+        :return: Plane of the steps until each cell frees up.
+        """
+        if out is None:
+            out = np.empty(self.body_serial.shape, dtype=np.int64)
+        np.subtract(self.body_serial, self.tail_serial() - 1, out=out, casting="unsafe")
+        np.greater(self.occupancy, 0, out=self._occupied_mask)
+        np.multiply(out, self._occupied_mask, out=out)
+        return out
@@ -0,0 +1,126 @@
+import random
+
+
+class FreeCellIndex:
+    """
+    Free cell index to keep track of the game area positions, that are not occupied by the snake.
+
+    The game area is represented implicitly by its bounds and only the occupied positions are stored,
+    so the index takes memory proportional to the snake's length instead of the size of the game area.
+    Occupying and freeing a position, counting and checking the free positions take constant time.
+    The amount of occupied positions is also counted per column, so the k-th free position can be found
+    without scanning the area.
+
+    Random positions are selected only based on which positions are free (not on the history of the game),
+    so a game restored from a saved state selects the same positions.
+    """
+
+    def __init__(self, left: int, top: int, width: int, height: int):
+        """
+        Free Cell Index constructor method.
+
+        All the positions of the rectangular area are free at the start.
+
+        :param left: Area's left edge x-coordinate measured in in-game blocks.
+        :param top: Area's top edge y-coordinate measured in in-game blocks.
+        :param width: Area's width measured in in-game blocks.
+        :param height: Area's height measured in in-game blocks.
+        """
+        self.left, self.top, self.width, self.height = left, top, width, height
+        self.occupied = set()  # Occupied positions (x, y) inside the area
+        self.column_occupied = [0] * width  # Amount of occupied positions in each column
+
+    def __len__(self) -> int:
+        """Amount of free positions."""
+        return self.width * self.height - len(self.occupied)
+
+    def __contains__(self, position: tuple[int, int]) -> bool:
+        """Check if the position is free."""
+        return self.in_area(position) and position not in self.occupied
+
+    def __iter__(self):
+        """Iterate over the free positions in sorted order (takes time proportional to the size of the area)."""
+        occupied = self.occupied
+        for x in range(self.left, self.left + self.width):
+            for y in range(self.top, self.top + self.height):
+                if (x, y) not in occupied:
+                    yield x, y
+
+    def in_area(self, position: tuple[int, int]) -> bool:
+        """Check if the position (x, y) is inside the area."""
+        x, y = position
+        return self.left <= x < self.left + self.width and self.top <= y < self.top + self.height
+
+    def add(self, position: tuple[int, int]) -> None:
+        """
+        Mark the position as free.
+
+        Positions, that are already free or outside the area, are ignored.
+
+        :param position: Position (x, y) that has been freed.
+        """
+        if position in self.occupied:
+            self.occupied.remove(position)
+            self.column_occupied[position[0] - self.left] -= 1
+
+    def discard(self, position: tuple[int, int]) -> None:
+        """
+        Mark the position as occupied.
+
+        Positions, that are not free (e.g. already occupied or outside the game area), are ignored.
+
+        :param position: Position (x, y) that has been occupied.
+        """
+        if self.in_area(position) and position not in self.occupied:
+            self.occupied.add(position)
+            self.column_occupied[position[0] - self.left] += 1
+
+    def random_position(self, rng: random.Random = None) -> tuple[int, int]:
+        """
+        Select a free position uniformly at random.
+
+        While there are many free positions, random positions of the area are drawn until a free one is found.
+        Once only a few positions are free (at most the square root of the area), the k-th free position
+        in sorted order is selected instead (see select_free_position), which takes time proportional to
+        the width and the height of the area.
+
+        :param rng: Random number generator to make the selection with.
+                    If not provided, the global random module is used.
+        :return: Randomly selected free position (x, y).
+        :raises IndexError: If there are no free positions left.
+        """
+        rng = rng or random
+        free_count = len(self)
+        if free_count * free_count > self.width * self.height:
+            occupied = self.occupied
+            while True:
+                position = self.left + rng.randrange(self.width), self.top + rng.randrange(self.height)
+                if position not in occupied:
+                    return position
+        if free_count == 0:
+            raise IndexError("Cannot choose from an empty sequence")
+        return self.select_free_position(rng.randrange(free_count))
+
+    def select_free_position(self, rank: int) -> tuple[int, int]:
+        """
+        Find the free position with the given rank in sorted order (the same order as iterating over the index).
+
+        The column is found from the per-column counts of the occupied positions, then the position
+        is found within the column.
+
+        :param rank: Index of the free position in sorted order (0 <= rank < amount of free positions).
+        :return: Free position (x, y).
+        """
+        height = self.height
+        for column, occupied_count in enumerate(self.column_occupied):
+            free_count = height - occupied_count
+            if rank < free_count:
+                break
+            rank -= free_count
+        x = self.left + column
+        occupied = self.occupied
+        for y in range(self.top, self.top + height):
+            if (x, y) not in occupied:
+                if rank == 0:
+                    return x, y
+                rank -= 1
@@ -0,0 +1,160 @@
+import json
+import time
+from collections import deque
+
+_MISSING = object()
+
+
+class Profiler:
+    """
+    Profiler to measure where the time goes in every frame of the game.
+
+    Methods are measured by instrumenting them: the method is replaced with a wrapper, that measures how long
+    each call takes, and adds the time to the method's metric for the current frame. The instrumentation is
+    installed only while the profiler is enabled and removed when it is disabled, so a disabled profiler
+    adds no overhead to the game at all.
+
+    At the end of every frame the frame's timings are added to the rolling windows of samples (used for averages
+    and percentiles) and, if an export file is set, written to the file as a line of JSON (metrics stream).
+    """
+
+    def __init__(self, window: int = 300, export_file=None):
+        """
+        Profiler constructor method.
+
+        :param window: Amount of the latest frames, that the averages and percentiles are calculated from.
+        :param export_file: Opened text file to write the metrics of every frame to (one JSON object per line).
+                            If set to None (default), the metrics are not exported.
+        """
+        self.window = window
+        self.export_file = export_file
+
+        self.enabled = False
+        self.instrumented = []  # Instrumented methods (target, method name, metric name, original attribute)
+        self.frame_timings = {}  # Time spent in each metric during the current frame, measured in seconds
+        self.samples = {}  # Metric name -> rolling window of the metric's timings per frame
+        self.frame_count = 0
+        self.last_frame_time = None
+
+    def add_method(self, target, method_name: str, metric_name: str) -> None:
+        """
+        Register the method to be measured, while the profiler is enabled.
+
+        :param target: Object or module, whose method should be measured.
+        :param method_name: Name of the method.
+        :param metric_name: Name of the metric, that the method's timings are added to.
+        """
+        self.instrumented.append([target, method_name, metric_name, _MISSING])
+        if self.enabled:
+            self.instrument(self.instrumented[-1])
+
+    def enable(self) -> None:
+        """Start measuring the registered methods."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.frame_timings = {}
+        self.last_frame_time = None
+        for method in self.instrumented:
+            self.instrument(method)
+
+    def disable(self) -> None:
+        """Stop measuring and restore the original methods."""
+        if not self.enabled:
+            return
+        self.enabled = False
+        for method in self.instrumented:
+            target, method_name, _, original = method
+            if original is _MISSING:
+                delattr(target, method_name)  # The method was looked up from the class
+            else:
+                setattr(target, method_name, original)
+            method[3] = _MISSING
+
+    def toggle(self) -> None:
+        """Turn the profiler on or off."""
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+
+    def instrument(self, method: list) -> None:
+        """
+        Replace the method with a wrapper, that measures the method's calls.
+
+        :param method: Registered method (target, method name, metric name, original attribute).
+        """
+        target, method_name, metric_name, _ = method
+        method[3] = vars(target).get(method_name, _MISSING)
+        original_method = getattr(target, method_name)
+        frame_timings = self.frame_timings
+        timer = time.perf_counter
+
+        def measured_method(*args, **kwargs):
+            start_time = timer()
+            try:
+                return original_method(*args, **kwargs)
+            finally:
+                frame_timings[metric_name] = frame_timings.get(metric_name, 0.0) + timer() - start_time
+
+        setattr(target, method_name, measured_method)
+
+    def end_frame(self) -> None:
+        """
+        Finish the current frame: store the frame's timings and export them (call once per frame).
+
+        The frame time is measured from the end of the previous frame.
+        """
+        if not self.enabled:
+            return
+        current_time = time.perf_counter()
+        if self.last_frame_time is not None:
+            self.frame_timings["frame"] = current_time - self.last_frame_time
+        self.last_frame_time = current_time
+
+        for metric_name, timing in self.frame_timings.items():
+            if metric_name not in self.samples:
+                self.samples[metric_name] = deque(maxlen=self.window)
+            self.samples[metric_name].append(timing)
+
+        if self.export_file is not None:
+            self.export_file.write(json.dumps({"frame": self.frame_count, "time": current_time,
+                                               "timings": self.frame_timings}) + "\n")
+        self.frame_count += 1
+        self.frame_timings.clear()
+
+    def fps(self) -> float:
+        """Achieved frames per second, averaged over the rolling window (0 if no frames have been measured)."""
+        frame_times = self.samples.get("frame")
+        if not frame_times:
+            return 0.0
+        return len(frame_times) / sum(frame_times)
+
+    def percentile(self, metric_name: str, percent: float) -> float:
+        """
+        Get the percentile of the metric's timings in the rolling window.
+
+        :param metric_name: Name of the metric.
+        :param percent: Percentile to get (0 - 100).
+        :return: Timing at the percentile measured in seconds (0 if the metric has not been measured).
+        """
+        timings = sorted(self.samples.get(metric_name, ()))
+        if not timings:
+            return 0.0
+        return timings[min(len(timings) - 1, round(percent / 100 * (len(timings) - 1)))]
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        Summarize the metrics in the rolling window.
+
+        :return: Metric name -> average, 50th, 95th and 99th percentile of the timings, measured in milliseconds.
+        """
+        summary = {}
+        for metric_name, timings in self.samples.items():
+            summary[metric_name] = {
+                "mean": sum(timings) / len(timings) * 1000,
+                "p50": self.percentile(metric_name, 50) * 1000,
+                "p95": self.percentile(metric_name, 95) * 1000,
+                "p99": self.percentile(metric_name, 99) * 1000,
+            }
+        return summary
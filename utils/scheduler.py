@@ -0,0 +1,77 @@
+import time
+
+
+class Scheduler:
+    """
+    Fixed timestep scheduler to run the game ticks independently of the frame rate.
+
+    Time passed since the previous frame is accumulated, and every full tick duration in the accumulated time
+    is one game tick to simulate before the next frame is displayed. So the game advances at the same speed,
+    no matter how fast the frames are displayed:
+        * if the frames are displayed faster than the ticks, some frames have no ticks to simulate,
+        * if displaying a frame takes longer than a tick, the next frame simulates several ticks (frames are skipped).
+
+    The amount of ticks per frame is limited, in case the game can not keep up at all (e.g. the window was dragged),
+    then the time exceeding the limit is dropped and the game slows down instead of simulating the backlog.
+
+    In the turbo mode a fixed, large amount of ticks is simulated every frame, so the game is fast-forwarded
+    as fast as the ticks can be simulated, without being limited by the time it takes to display the frames.
+    """
+
+    def __init__(self, tick_rate: float, max_ticks_per_frame: int = 5, turbo_ticks_per_frame: int = 1000,
+                 timer=time.perf_counter):
+        """
+        Scheduler constructor method.
+
+        :param tick_rate: The amount of game ticks per second.
+        :param max_ticks_per_frame: The maximum amount of ticks to simulate per frame (outside the turbo mode).
+        :param turbo_ticks_per_frame: The amount of ticks to simulate per frame in the turbo mode.
+        :param timer: Function, that returns the current time in seconds.
+        """
+        self.tick_rate = tick_rate
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.turbo_ticks_per_frame = turbo_ticks_per_frame
+        self.timer = timer
+
+        self.turbo = False
+        self.accumulated_time = 0.0  # Time, that has not been simulated yet, measured in seconds
+        self.last_frame_time = timer()
+
+    def reset(self) -> None:
+        """
+        Discard the accumulated time, e.g. while the game is paused.
+
+        The time until the next frame is measured from the moment of the reset.
+        """
+        self.accumulated_time = 0.0
+        self.last_frame_time = self.timer()
+
+    def toggle_turbo(self) -> None:
+        """Turn the turbo mode on or off."""
+        self.turbo = not self.turbo
+        self.reset()
+
+    def frame_ticks(self) -> int:
+        """
+        Get the amount of ticks to simulate before displaying the next frame.
+
+        Has to be called once per frame.
+
+        :return: Amount of ticks to simulate.
+        """
+        current_time = self.timer()
+        elapsed_time = current_time - self.last_frame_time
+        self.last_frame_time = current_time
+
+        if self.turbo:
+            return self.turbo_ticks_per_frame
+
+        tick_duration = 1 / self.tick_rate
+        self.accumulated_time += elapsed_time
+        ticks = int(self.accumulated_time // tick_duration)
+        if ticks > self.max_ticks_per_frame:
+            ticks = self.max_ticks_per_frame
+            self.accumulated_time = 0.0  # Drop the backlog, the game can not keep up
+        else:
+            self.accumulated_time -= ticks * tick_duration
+        return ticks
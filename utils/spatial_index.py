@@ -0,0 +1,84 @@
+class SpatialIndex:
+    """
+    Spatial index of the snake's body positions, that finds the positions inside a rectangular region
+    without going through the whole body.
+
+    The coordinates are divided into square chunks, each chunk stores the body positions inside it.
+    Every body position is identified by its serial number, which is assigned when the position becomes the head
+    (see Snake.head_serial), so a position's index in the body is the head's serial minus the position's serial.
+    Adding and removing a position take constant time, finding the positions inside a region takes time
+    proportional to the amount of chunks and positions in the chunks, that the region overlaps.
+    """
+
+    def __init__(self, chunk_size: int = 16):
+        """
+        Spatial Index constructor method.
+
+        :param chunk_size: Width and height of the chunks measured in in-game blocks.
+        """
+        self.chunk_size = chunk_size
+        self.chunks = {}  # Chunk coordinates (x, y) -> {serial: position (x, y)}
+
+    def __len__(self) -> int:
+        """Amount of indexed positions."""
+        return sum(len(chunk) for chunk in self.chunks.values())
+
+    def add(self, position: tuple[int, int], serial: int) -> None:
+        """
+        Add the body position to the index.
+
+        :param position: Coordinates (x, y) of the body position.
+        :param serial: Serial number of the body position.
+        """
+        x, y = position
+        chunk_key = x // self.chunk_size, y // self.chunk_size
+        chunk = self.chunks.get(chunk_key)
+        if chunk is None:
+            chunk = self.chunks[chunk_key] = {}
+        chunk[serial] = position
+
+    def remove(self, position: tuple[int, int], serial: int) -> None:
+        """
+        Remove the body position from the index.
+
+        :param position: Coordinates (x, y) of the body position.
+        :param serial: Serial number of the body position.
+        """
+        x, y = position
+        chunk_key = x // self.chunk_size, y // self.chunk_size
+        chunk = self.chunks[chunk_key]
+        del chunk[serial]
+        if not chunk:
+            del self.chunks[chunk_key]
+
+    def clear(self) -> None:
+        """Remove all the positions from the index."""
+        self.chunks.clear()
+
+    def query(self, left: int, top: int, width: int, height: int) -> list[tuple[int, tuple[int, int]]]:
+        """
+        Find the body positions inside the rectangular region.
+
+        :param left: Region's left edge x-coordinate measured in in-game blocks.
+        :param top: Region's top edge y-coordinate measured in in-game blocks.
+        :param width: Region's width measured in in-game blocks.
+        :param height: Region's height measured in in-game blocks.
+        :return: List of the serial numbers and coordinates (serial, (x, y)) of the positions inside the region.
+        """
+        right, bottom = left + width, top + height
+        chunk_size = self.chunk_size
+        chunks = self.chunks
+        found = []
+        for chunk_x in range(left // chunk_size, (right - 1) // chunk_size + 1):
+            for chunk_y in range(top // chunk_size, (bottom - 1) // chunk_size + 1):
+                chunk = chunks.get((chunk_x, chunk_y))
+                if chunk is None:
+                    continue
+                # Chunks on the edges of the region may contain positions outside of it
+                if (chunk_x * chunk_size >= left and (chunk_x + 1) * chunk_size <= right and
+                        chunk_y * chunk_size >= top and (chunk_y + 1) * chunk_size <= bottom):
+                    found.extend(chunk.items())
+                else:
+                    found.extend((serial, (x, y)) for serial, (x, y) in chunk.items()
+                                 if left <= x < right and top <= y < bottom)
+        return found
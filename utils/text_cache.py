@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """
+    Text cache class to reuse rendered text surfaces.
+
+    Rendering text with a font is expensive compared to displaying an already rendered surface,
+    while most of the texts on the screen (e.g. instructions, scheme name and scores) rarely change.
+    The surfaces are stored by (text, font, color) and the least recently used surface is evicted
+    once the cache is full, so texts that change often (e.g. scores) don't grow the cache indefinitely.
+    """
+
+    def __init__(self, max_size: int = 64):
+        """
+        Text Cache constructor method.
+
+        :param max_size: The maximum amount of rendered surfaces to keep.
+        """
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, text: str, font, color):
+        """
+        Get the surface of the text rendered in the font and color (anti-aliased).
+
+        The text is rendered only if it is not already in the cache.
+
+        :param text: Text to render.
+        :param font: Font to render the text with.
+        :param color: Color to render the text in.
+        :return: Surface with the rendered text.
+        """
+        key = (text, font, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self) -> None:
+        """Remove all the rendered surfaces from the cache."""
+        self.surfaces.clear()